@@ -7,6 +7,8 @@ import serial
 import time
 import threading
 
+from src.iq_storage import load_frames
+
 ser_rafar = None
 ser_model = None
 
@@ -44,7 +46,8 @@ def thread_log(complete_logs, log_folder, frequency, ser_model):
         df_rx = []
         size = 0
         for rx_index in range(3):
-            df_rx.append(np.load(os.path.join(log_folder,file_log + f"_rx{rx_index}.npy")))
+            # complex64 frames, int16 I/Q recordings are converted frame by frame
+            df_rx.append(load_frames(os.path.join(log_folder,file_log + f"_rx{rx_index}.npy")))
             if size < len(df_rx[-1]):
                 size = len(df_rx[-1])
 
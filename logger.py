@@ -1,45 +1,92 @@
+import src.startup_profile as startup_profile
+import sys
+
+if __name__ == '__main__' and startup_profile.requested():
+    # re-run under the interpreter import timer before anything heavy is imported here
+    sys.exit(startup_profile.run())
+
+import argparse
 import json
 import pyqtgraph as pg
-import matplotlib.image as mpimg
 import numpy as np
 import threading
 import os
 import time
-import serial
-from scipy import signal, constants
 
-from serial.tools import list_ports
-import sounddevice as sd
 from pyqtgraph.Qt.QtWidgets import (QGraphicsProxyWidget, QLineEdit, QPushButton, QLabel, 
                                     QFormLayout, QWidget, QVBoxLayout, QComboBox, QListView, 
                                     QRadioButton, QGraphicsEllipseItem, QButtonGroup, 
-                                    QGraphicsRectItem, QMessageBox, QGroupBox, QHBoxLayout, QMainWindow, QCheckBox)
+                                    QGraphicsRectItem, QMessageBox, QGroupBox, QHBoxLayout, QMainWindow, QCheckBox, QFileDialog)
 from pyqtgraph.Qt.QtCore import QRegExp, QSize, QThread, pyqtSignal, Qt, pyqtSlot
 from pyqtgraph.Qt.QtGui import QRegExpValidator
 
-from PyQt5.QtCore import QThread, pyqtSignal, QTimer
-from bleak import BleakScanner, BleakClient
-from blehrm import blehrm
-from collections import deque
+from PyQt5.QtCore import QCoreApplication, QObject, QThread, pyqtSignal, QTimer
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtWidgets import QGraphicsPixmapItem
 import asyncio
-import csv
-import re
+import concurrent.futures
 
 import asyncio
 
 import src.gdx as gdx
+from src.frame_buffer import FrameQueue, DoubleBuffer
+from src.serial_reader import SerialFrameReader, FRAME, RANGING
+from src.heatmap import RollingHeatmap
+from src.declutter import Declutter
+from src.range_fft import RangeFFT
+from src.session_clock import SessionClock
+from src.column_buffer import ColumnBuffer
+from src.writers import WriterService, write_array
+from src.catalog import DatasetCatalog
+from src.device_pool import DevicePool
+from src.protocol import Protocol, GRID_POSITIONS, position_label
+from src.imu_packet import is_binary_packet, decode_packet
+from src.ble_manager import BLEManager
+from src.alignment import AlignmentIndex
+from src.port_probe import PortCache, find_ports
+from src.acquisition import Acquisition, AcquisitionParameters
+from src.process_runner import ProcessRunner
+from src.sr250_source import sr250_source, row_dtype, frame_shape, decode_frames, range_of_interest, DISCARDED
+from src.iq_storage import to_complex, STORAGE_MODES
+from src.health import DeviceHealth, FrameTimes, PerformanceReport
+import src.cues as cues
 gdx = gdx.gdx()
-
-class SR250MateSignalProcessing(QThread):
+# event loop shared by the Polar and Nano clients and by the BLE scans of the form
+ble = BLEManager()
+# every recording is saved through this thread, never on an acquisition or GUI thread
+writer = WriterService()
+# serial ports and BLE clients stay open between acquisitions
+pool = DevicePool(ble)
+
+class SR250MateSignalProcessing(QThread, Acquisition):
     collection_finished = pyqtSignal(object,str)
+    save_failed = pyqtSignal(str, str)
     signalLive = pyqtSignal()
     signalRanging = pyqtSignal(int)
 
 
-    def __init__(self, stop_event,fps, sr250active, sr250rangingActive):
+    def __init__(self, stop_event,fps, sr250active, sr250rangingActive, refresh_hz=20, clock=None, device_index=0, play_cue=True, port=None, worker_process=False, compression=None, bins=None, storage="complex64"):
         super().__init__()
         self.fps=fps
+        # "int16" keeps the I/Q pairs sent by the radar, half the memory and disk of complex64
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"Unknown SR250 storage {storage}, use one of {STORAGE_MODES}")
+        self.storage = storage
+        # None saves the antennas as .npy, "gzip" or "lzf" as compressed .h5
+        self.compression = compression
         self.stop_event = stop_event
+        self.refresh_hz = refresh_hz
+        self.clock = clock if clock is not None else SessionClock()
+        self.device_index = device_index
+        self.play_cue = play_cue
+
+        # the first radar keeps the historical file names, the others get their index
+        self.device_label = "sr250" if device_index == 0 else f"sr250-{device_index}"
+        self.name = self.device_label
+        self.port = port
+        # read and decode the serial stream in a worker process instead of a thread
+        self.worker_process = worker_process
+        self.ser = None
 
         self.taps = 128
         
@@ -47,11 +94,14 @@ class SR250MateSignalProcessing(QThread):
         self.num_ant = 3
         self.bytes_per_cir = self.taps * 4 *self.num_ant
 
-        self.frame = np.empty((0), dtype = np.uint8)
-        self.append_flag = False
+        # range of interest (start, stop) kept of every CIR, see src.sr250_source.range_of_interest()
+        self.bins = bins or (0, self.range_bins)
+        self.roi_bins = self.bins[1] - self.bins[0]
 
         self.read_ranging = sr250rangingActive
 
+        self.frame_queue = FrameQueue(maxlen=4096)
+
         self.datasets = "datasets"
 
 
@@ -59,19 +109,23 @@ class SR250MateSignalProcessing(QThread):
 
     def run(self):
         self.start_radar() #return when total_samples_required are collected
+        self.health.stop()
         if not self.stop_event.is_set():
             
-            t = np.linspace(0, 0.5, int(44100 * 0.5), endpoint=False)
-            wave = 0.5 * np.sin(2 * np.pi * 440 * t)
-            sd.play(wave, 44100)
-            sd.wait()  # Wait until the sound is finished
+            if self.play_cue:
+                cues.play()
 
             self.save_data()
         #self.stop_event.clear()
         print("DATA ACQUISITION FINISHED!")
 
 
-    def set_parameters(self, device, samples_number, window_duration, datasets, user_id, activity, room, target_position, timestamp):
+    def configure(self, params):
+        self.catalog = params.catalog
+        self.set_parameters(self.port, params.samples_number, params.window_duration, params.datasets, params.user_id, params.activity, params.room, params.target_position, params.timestamp, alignment=params.alignment)
+
+
+    def set_parameters(self, device, samples_number, window_duration, datasets, user_id, activity, room, target_position, timestamp, alignment=None):
         self.samples_number = samples_number
         self.window_duration = window_duration
         self.datasets = datasets
@@ -82,107 +136,205 @@ class SR250MateSignalProcessing(QThread):
         self.timestamp = timestamp
         self.total_samples_required = int(self.samples_number * (self.fps * self.window_duration) + self.fps) #add a second to have enough samples for decluttering
 
-        self.frames  = np.zeros((self.total_samples_required, self.num_ant, self.range_bins), dtype=np.complex64)
+        shape, dtype = frame_shape(self.num_ant, self.roi_bins, self.storage)
+        self.frames  = np.zeros((self.total_samples_required,) + shape, dtype=dtype)
         self.twr  = np.zeros(self.total_samples_required, dtype=np.uint16)
+        self.frame_times = np.zeros(self.total_samples_required, dtype=np.float64)
         self.samples_collected = 0
+        self.port = device
+        self.alignment = alignment
+
+        # frames handed to the GUI at refresh_hz, a few refresh periods of headroom
+        preview_capacity = max(64, 4 * int(np.ceil(self.fps / self.refresh_hz)))
+        self.preview = DoubleBuffer(preview_capacity, (self.num_ant, self.roi_bins), np.complex64)
+        self.frame_queue.clear()
+        self.health = DeviceHealth(self.name, expected_rate=self.fps)
  
         print(f"Starting radar data acquisition for {self.user_id}...")
         print(f"Samples number: {self.samples_number}, Window duration: {self.window_duration} s")
 
-        self.ser = serial.Serial(device, timeout=1)
+        if not self.worker_process:
+            # open since a previous acquisition, or opened now and kept for the next ones
+            self.ser = pool.serial(device)
 
 
 
     def start_radar(self):
 
-        len_antenna = self.taps*2
-
-        pattern = r":\s*(\d+)"
+        if self.worker_process:
+            self.start_radar_process()
+            return
 
         try:
             self.ser.write(b"START")
 
-            while not self.stop_event.is_set():
+            reader = SerialFrameReader(self.ser, self.frame_queue, self.read_ranging, clock=self.clock)
+            reader.start()
 
-                data = self.ser.readline()
+            publish_period = 1.0 / self.refresh_hz
+            next_publish = time.monotonic() + publish_period
 
-                #print(data)
+            while not self.stop_event.is_set() and self.samples_collected < self.total_samples_required:
 
-                if not self.append_flag:
+                self.health.set_queue_depth(len(self.frame_queue))
+                items = self.frame_queue.drain()
 
-                    if data == b"BEGIN\n":
+                if items:
+                    t0 = time.perf_counter()
+                    self.process_items(items)
+                    self.health.add_parse_time(time.perf_counter() - t0)
+                    self.health.dropped = self.frame_queue.dropped
+                else:
+                    time.sleep(0.002)
 
-                        self.append_flag=True
+                now = time.monotonic()
+                if now >= next_publish:
+                    next_publish = now + publish_period
+                    if self.preview.publish():
+                        self.signalLive.emit()
 
+            reader.stop()
+            reader.join()
 
-                    elif self.read_ranging and "TWR[0].distance" in str(data):
-                        try:
-                            match = re.search(pattern, str(data))
-                            distance_detected = np.uint16(match.group(1)) - 4630
+            if self.preview.publish():
+                self.signalLive.emit()
 
-                            self.twr[self.samples_collected] = distance_detected
-                            #print(f"Distance detected: {distance_detected} cm")
-                            #print(f"Sample collected: {self.samples_collected}")
+            if self.frame_queue.dropped:
+                print(f"SR250 reader queue full, {self.frame_queue.dropped} frames dropped")
 
-                            self.signalRanging.emit(distance_detected)
+            self.ser.write(b"STOP")
+            #self.ser.close()
+        
+        except Exception as e:
+            print(f"Error: {e}")
 
-                        except Exception as e:
-                            print("Error parsing presence data: ", e)
-                            pass
-                
+
+    def start_radar_process(self):
+
+        runner = ProcessRunner(sr250_source, args=(self.port, self.read_ranging, self.clock.start_monotonic, self.clock.start_wall, self.num_ant, self.taps, self.range_bins, self.bins, self.storage),
+                               capacity=4096, dtype=row_dtype(self.num_ant, self.roi_bins, self.storage))
+
+        try:
+            runner.start()
+
+            publish_period = 1.0 / self.refresh_hz
+            next_publish = time.monotonic() + publish_period
+
+            while not self.stop_event.is_set() and self.samples_collected < self.total_samples_required and runner.is_alive():
+
+                self.health.set_queue_depth(len(runner.ring))
+                rows = runner.read()
+
+                if len(rows):
+                    t0 = time.perf_counter()
+                    self.process_rows(rows)
+                    self.health.add_parse_time(time.perf_counter() - t0)
+                    self.health.dropped = runner.dropped
                 else:
+                    time.sleep(0.002)
+
+                now = time.monotonic()
+                if now >= next_publish:
+                    next_publish = now + publish_period
+                    if self.preview.publish():
+                        self.signalLive.emit()
 
-                    if(data == b"END\n"):
-                        
-                        self.frame = self.frame[:-1]
+            # the worker may have written its last rows after the previous read, before exiting
+            while not self.stop_event.is_set() and self.samples_collected < self.total_samples_required:
+                rows = runner.read()
+                if not len(rows):
+                    break
+                self.process_rows(rows)
+                self.health.dropped = runner.dropped
 
-                        if(self.frame.shape[0]==self.bytes_per_cir):
-                            self.frame = self.frame.view(np.int16)
-                            
-                            rx1 = self.frame[:len_antenna]
-                            rx2 = self.frame[len_antenna:len_antenna*2]
-                            rx3 = self.frame[len_antenna*2:] 
-                            cir_casted_int16 = rx1[16:].reshape((len_antenna*2 - 32) // 4, 2)
-                            rx1_complex = (cir_casted_int16[:, 0] + 1j * cir_casted_int16[:, 1]).astype(np.complex64)
+            if self.preview.publish():
+                self.signalLive.emit()
 
-                            cir_casted_int16 = rx2[16:].reshape((len_antenna*2 - 32) // 4, 2)
-                            rx2_complex = (cir_casted_int16[:, 0] + 1j * cir_casted_int16[:, 1]).astype(np.complex64)
+            if runner.dropped:
+                print(f"SR250 worker ring full, {runner.dropped} frames dropped")
 
-                            cir_casted_int16 = rx3[16:].reshape((len_antenna*2 - 32) // 4, 2)
-                            rx3_complex = (cir_casted_int16[:, 0] + 1j * cir_casted_int16[:, 1]).astype(np.complex64)
+        except Exception as e:
+            print(f"Error: {e}")
 
+        finally:
+            runner.stop()
 
-                            self.frames[self.samples_collected, 0, :] = rx1_complex
-                            self.frames[self.samples_collected, 1, :] = rx2_complex
-                            self.frames[self.samples_collected, 2, :] = rx3_complex
-                            self.signalLive.emit()
-                            self.samples_collected +=1
 
-                            if self.samples_collected == self.total_samples_required:
-                                break
+    def process_rows(self, rows):
+        # rows of src.sr250_source.row_dtype, already decoded by the worker process
 
-                        else:
+        is_frame = rows["kind"] == FRAME
+        is_ranging = rows["kind"] == RANGING
+        self.health.add_malformed(int(np.count_nonzero(rows["kind"] == DISCARDED)))
 
-                            print("Frame of shape ",self.frame.shape, "discarded")
+        if self.read_ranging and is_ranging.any():
+            # a distance belongs to the frame that follows it
+            frames_before = np.cumsum(is_frame) - is_frame
+            for index, distance in zip(self.samples_collected + frames_before[is_ranging], rows["distance"][is_ranging]):
+                distance_detected = np.uint16(distance) - 4630
+                if index < self.total_samples_required:
+                    self.twr[index] = distance_detected
+                self.signalRanging.emit(distance_detected)
 
-                        self.frame = np.empty((0), dtype=np.uint8 )
+        frames = rows[is_frame][:self.total_samples_required - self.samples_collected]
 
-                        self.append_flag = False
+        if len(frames):
+            start = self.samples_collected
+            stop = start + len(frames)
 
+            self.frames[start:stop] = frames["frame"]
+            self.frame_times[start:stop] = frames["time"]
+            self.write_preview(start, stop)
+            self.samples_collected = stop
+            self.health.add_samples(len(frames))
 
-                        
 
-                    else:
+    def process_items(self, items):
 
-                        self.frame = np.concatenate([self.frame, np.frombuffer(data, dtype=np.uint8)])
+        payloads = []
+        times = []
 
-            self.ser.write(b"STOP")
-            #self.ser.close()
-        
-        except Exception as e:
-            print(f"Error: {e}")
+        for kind, value, t in items:
 
-        
+            if kind == FRAME:
+
+                if len(value) == self.bytes_per_cir:
+                    payloads.append(value)
+                    times.append(t)
+                else:
+                    print("Frame of shape ",(len(value),), "discarded")
+                    self.health.add_malformed()
+
+            elif kind == RANGING:
+                index = self.samples_collected + len(payloads)
+                distance_detected = np.uint16(value) - 4630
+
+                if index < self.total_samples_required:
+                    self.twr[index] = distance_detected
+
+                self.signalRanging.emit(distance_detected)
+
+        payloads = payloads[:self.total_samples_required - self.samples_collected]
+
+        if payloads:
+            start = self.samples_collected
+            stop = start + len(payloads)
+
+            self.decode_frames(payloads, self.frames[start:stop])
+            self.frame_times[start:stop] = times[:len(payloads)]
+            self.write_preview(start, stop)
+            self.samples_collected = stop
+            self.health.add_samples(len(payloads))
+
+
+    def write_preview(self, start, stop):
+        block = self.frames[start:stop]
+        # the heatmap wants complex frames, only the new block is converted
+        self.preview.write(start, to_complex(block) if self.storage == "int16" else block)
+
+
+    def decode_frames(self, payloads, out):
+        decode_frames(payloads, out, self.num_ant, self.taps, self.range_bins, self.bins)
 
 
 
@@ -203,15 +355,12 @@ class SR250MateSignalProcessing(QThread):
 
     def save_data(self):
 
-        file_list = []
-
         filepath = os.path.join(self.datasets,"SR250Mate")
 
         if self.read_ranging:
             filepath += "_Ranging"
 
-        if not os.path.exists(filepath):
-            os.mkdir(filepath)
+        os.makedirs(filepath, exist_ok=True)
 
 
         filename=f"{self.user_id}_{self.activity}"
@@ -228,52 +377,291 @@ class SR250MateSignalProcessing(QThread):
 
         print(self.frames.shape)
 
-        if self.read_ranging:
-            twr_col = self.twr.reshape(-1, 1)
-
-        for i in range(self.num_ant):
+        # the arrays are reallocated by the next set_parameters(), the writer can keep these
+        frames, twr, frame_times = self.frames, self.twr, self.frame_times
 
-            data=self.frames[:,i,:]
-            if self.read_ranging:
-                data_with_twr = np.concatenate([twr_col, data], axis=1)
+        def write():
+            file_list = []
 
+            for i in range(self.num_ant):
 
-            file = f"{filepath}_sr250_rx{i}.npy"
+                data = frames[:,i]
+                if self.read_ranging:
+                    if self.storage == "int16":
+                        # the distance becomes a first (twr, 0) pair, its uint16 bits kept as int16
+                        column = np.zeros((len(twr), 1, 2), dtype=np.int16)
+                        column[:, 0, 0] = twr.view(np.int16)
+                    else:
+                        column = twr.reshape(-1, 1)
+                    data = np.concatenate([column, data], axis=1)
 
-            #data = data.view(np.float32)
-            np.save(file, data_with_twr if self.read_ranging else data)
+                file_list.append(write_array(f"{filepath}_{self.device_label}_rx{i}", data, self.compression))
 
+            # arrival time of every frame on the session clock shared by all the devices
+            file = f"{filepath}_{self.device_label}_times.npz"
+            # the saved frames hold the CIR bins [start_bin, stop_bin) only
+            np.savez(file, times=frame_times, session_start=self.clock.start_wall, port=str(self.port), start_bin=self.bins[0], stop_bin=self.bins[1], storage=self.storage)
             file_list.append(file)
 
-            
-        self.collection_finished.emit(file_list, "SR250Mate Ranging" if self.read_ranging else "SR250Mate")
+            return file_list
+
+        def saved(file_list):
+            self.register_files(frame_times, file_list)
+
+            device_name = "SR250Mate Ranging" if self.read_ranging else "SR250Mate"
+            if self.device_index:
+                device_name += f" #{self.device_index + 1}"
+
+            self.collection_finished.emit(file_list, device_name)
+
+        writer.submit(write, saved, self.save_error)
+
+
+
+
+
+class InfineonSignalProcessing(QThread, Acquisition):
+    collection_finished = pyqtSignal(object,str)
+    save_failed = pyqtSignal(str, str)
+    signalLive = pyqtSignal()
+    name = "infineon"
+
+
+    def __init__(self, stop_event, fps, refresh_hz=20, clock=None, compression=None):
+        super().__init__()
+        self.fps = fps
+        self.compression = compression
+        self.stop_event = stop_event
+        self.refresh_hz = refresh_hz
+        self.clock = clock if clock is not None else SessionClock()
+
+        self.num_ant = 3
+        self.num_chirps = 4
+        self.num_samples = 128
+        self.range_bins = 120
+        # the SDK returns samples normalized to [0, 1]
+        self.adc_full_scale = 1.0
+
+        self.range_fft = RangeFFT(self.num_samples)
+
+        self.datasets = "datasets"
+
+
+    def run(self):
+        self.start_radar() #return when total_samples_required are collected
+        self.health.stop()
+        if not self.stop_event.is_set():
+            self.save_data()
+        print("DATA ACQUISITION FINISHED!")
+
+
+    def configure(self, params):
+        self.catalog = params.catalog
+        self.set_parameters(params.samples_number, params.window_duration, params.datasets, params.user_id, params.activity, params.room, params.target_position, params.timestamp, alignment=params.alignment)
+
+
+    def set_parameters(self, samples_number, window_duration, datasets, user_id, activity, room, target_position, timestamp, alignment=None):
+        self.samples_number = samples_number
+        self.window_duration = window_duration
+        self.datasets = datasets
+        self.user_id = user_id
+        self.activity = activity
+        self.room = room
+        self.target_position = target_position
+        self.timestamp = timestamp
+        self.alignment = alignment
+        self.total_samples_required = int(self.samples_number * (self.fps * self.window_duration) + self.fps) #add a second to have enough samples for decluttering
+
+        self.frames = np.zeros((self.total_samples_required, self.num_ant, self.num_chirps, self.num_samples), dtype=np.float32)
+        self.frame_times = np.zeros(self.total_samples_required, dtype=np.float64)
+        # range profile of the last frame only, it feeds the preview and is not saved
+        self.profile = np.zeros((1, self.num_ant, self.range_bins), dtype=np.complex64)
+        self.samples_collected = 0
+
+        preview_capacity = max(64, 4 * int(np.ceil(self.fps / self.refresh_hz)))
+        self.preview = DoubleBuffer(preview_capacity, (self.num_ant, self.range_bins), np.complex64)
+        self.health = DeviceHealth(self.name, expected_rate=self.fps)
+
+        print(f"Starting Infineon data acquisition for {self.user_id}...")
+        print(f"Samples number: {self.samples_number}, Window duration: {self.window_duration} s")
 
 
+    def sequence_config(self):
+        from ifxradarsdk.fmcw.types import FmcwSimpleSequenceConfig, FmcwSequenceChirp
+
+        return FmcwSimpleSequenceConfig(
+            frame_repetition_time_s=1 / self.fps,
+            chirp_repetition_time_s=0.0005,
+            num_chirps=self.num_chirps,
+            tdm_mimo=False,
+            chirp=FmcwSequenceChirp(
+                start_frequency_Hz=60e9,
+                end_frequency_Hz=61.5e9,
+                sample_rate_Hz=1e6,
+                num_samples=self.num_samples,
+                rx_mask=(1 << self.num_ant) - 1,
+                tx_mask=1,
+                tx_power_level=31,
+                lp_cutoff_Hz=500000,
+                hp_cutoff_Hz=80000,
+                if_gain_dB=33,
+            ),
+        )
 
 
+    def start_radar(self):
+
+        try:
+            from ifxradarsdk.fmcw import DeviceFmcw
+
+            with DeviceFmcw() as device:
+                sequence = device.create_simple_sequence(self.sequence_config())
+                device.set_acquisition_sequence(sequence)
+
+                publish_period = 1.0 / self.refresh_hz
+                next_publish = time.monotonic() + publish_period
+
+                while not self.stop_event.is_set() and self.samples_collected < self.total_samples_required:
+
+                    frame = device.get_next_frame()[0]
+                    n = self.samples_collected
+
+                    self.frame_times[n] = self.clock.now()
+                    t0 = time.perf_counter()
+                    self.frames[n] = frame
+                    self.profile[0] = self.range_profile(self.frames[n])
+                    self.health.add_parse_time(time.perf_counter() - t0)
+                    self.preview.write(n, self.profile)
+                    self.samples_collected += 1
+                    self.health.add_samples()
+
+                    now = time.monotonic()
+                    if now >= next_publish:
+                        next_publish = now + publish_period
+                        if self.preview.publish():
+                            self.signalLive.emit()
+
+            if self.preview.publish():
+                self.signalLive.emit()
+
+        except Exception as e:
+            print(f"Error: {e}")
+
+
+    def range_profile(self, frame):
+        # all antennas and chirps of the frame in a single batched FFT, then average the chirps
+        data = 2 * frame / self.adc_full_scale - 1.0
+        range_fft = self.range_fft(data)
+        return range_fft.mean(axis=1)[:, :self.range_bins]
+
+
+    def stop_acquisition(self):
+
+        self.stop_event.set()
+
+        print(f"Stopping Infineon data acquisition for {self.user_id}...")
+
+
+    def save_data(self):
 
-class PolarBLESignalProcessing(QThread):
+        filepath = os.path.join(self.datasets,"Infineon")
+
+        os.makedirs(filepath, exist_ok=True)
+
+        filename=f"{self.user_id}_{self.activity}"
+
+        if self.room:
+            filename += f"_{self.room}"
+
+        if self.target_position:
+            filename += f"_{self.target_position}"
+
+        filename += f"_{self.timestamp}"
+
+        filepath = os.path.join(filepath,filename)
+
+        frames = self.frames[:self.samples_collected]
+        frame_times = self.frame_times[:self.samples_collected]
+
+        def write():
+            return [write_array(f"{filepath}_infineon_rx{i}", frames[:, i], self.compression) for i in range(self.num_ant)]
+
+        def saved(file_list):
+            self.register_files(frame_times, file_list)
+
+            self.collection_finished.emit(file_list, "Infineon")
+
+        writer.submit(write, saved, self.save_error)
+
+
+
+# accelerometer samples per second streamed by the Polar H10
+POLAR_ACC_RATE = 200
+
+
+class PolarBLESignalProcessing(QObject, Acquisition):
     collection_finished = pyqtSignal(object, str)
+    save_failed = pyqtSignal(str, str)
     signalLive = pyqtSignal(float, float, float)
+    name = "polar"
 
     def __init__(self, stop_event):
         super().__init__()
         self.stop_event = stop_event
         self.address = None
         self.datasets = "datasets"
-        self.acc_data = deque(maxlen=50000)
+        self.acc_data = ColumnBuffer([("timestamp", np.float64), ("timestamp_polar", np.int64),
+                                      ("acc_x", np.int16), ("acc_y", np.int16), ("acc_z", np.int16),
+                                      ("session_time", np.float64)])
         self.recording = False
+        # taken by the BLE loop to append a sample and by the GUI thread to end the recording
+        self.acc_lock = threading.Lock()
         self.timer = None
         self.blehrm_client = None
         self.connected = False
+        self.future = None
+        self.alignment = None
+        self.clock = SessionClock()
+        self.params = None
+
+    def configure(self, params):
+        # the stream is already running since start(), recording begins at begin()
+        self.params = params
+        self.catalog = params.catalog
+
+    def begin(self):
+        p = self.params
+        self.health = DeviceHealth(self.name, expected_rate=POLAR_ACC_RATE)
+        self.health.start()
+        self.start_recording(p.user_id, p.activity, p.room, p.target_position, p.timestamp, p.window_duration, p.samples_number, alignment=p.alignment)
+
+    def stop(self):
+        # ends the recording only, the stream keeps running for the preview
+        if self.timer:
+            self.timer.stop()
+        with self.acc_lock:
+            self.recording = False
+        if self.health is not None:
+            self.health.stop()
+
+    def done(self):
+        return not self.recording
+
+    @property
+    def progress(self):
+        return len(self.acc_data)
 
-    def set_parameters(self, address, datasets):
+    def set_parameters(self, address, datasets, save_format="csv"):
         self.address = address
         self.datasets = datasets
-
-    def start_recording(self, user_id, activity, room, target_position, timestamp, window_duration, samples_number):
-        self.acc_data.clear()
-        self.recording = True
+        self.save_format = save_format
+
+    def start_recording(self, user_id, activity, room, target_position, timestamp, window_duration, samples_number, alignment=None):
+        self.alignment = alignment
+        self.clock = alignment.clock if alignment is not None else SessionClock()
+        with self.acc_lock:
+            self.acc_data.clear()
+            self.recording = True
         self.user_id=user_id
         self.activity=activity
         self.room=room
@@ -293,16 +681,31 @@ class PolarBLESignalProcessing(QThread):
         self.timer.start(total_time * 1000)
 
     def stop_recording(self):
-        if self.recording:
+        with self.acc_lock:
+            if not self.recording:
+                return
+            # no sample is appended once the lock is released, the snapshot is consistent
             self.recording = False
-            self.save_data()
+            columns = {name: values.copy() for name, values in self.acc_data.columns().items()}
 
-    def run(self):
-        asyncio.run(self.collect_data())
+        if self.health is not None:
+            self.health.stop()
+        self.save_data(columns)
+
+    def start(self):
+        # the stream runs on the shared BLE loop, not on a thread of its own
+        self.future = ble.submit(self.collect_data())
+
+    def wait(self):
+        if self.future is not None:
+            concurrent.futures.wait([self.future])
 
     async def collect_data(self):
-        devices = await BleakScanner.discover()
-        ble_device = next((d for d in devices if d.address == self.address), None)
+        from bleak import BleakScanner
+        from blehrm import blehrm
+
+        # the background scanner has normally seen it already, no discovery then
+        ble_device = ble.known_device(self.address) or await BleakScanner.find_device_by_address(self.address)
 
         if not ble_device:
             print(f"Polar {self.address} not found.")
@@ -320,8 +723,10 @@ class PolarBLESignalProcessing(QThread):
             timestamp_polar, x, y, z = sample
             self.signalLive.emit(float(x), float(y), float(z))
 
-            if self.recording:
-                self.acc_data.append((ts, timestamp_polar, x, y, z))           
+            with self.acc_lock:
+                if self.recording:
+                    self.acc_data.append(ts, timestamp_polar, x, y, z, self.clock.now())
+                    self.health.add_samples()
 
         
         await self.blehrm_client.start_acc_stream(update_acc)
@@ -341,7 +746,7 @@ class PolarBLESignalProcessing(QThread):
             self.connected = False
             self.blehrm_client = None
 
-    def save_data(self):
+    def save_data(self, columns):
         filepath = os.path.join(self.datasets,"PolarBLE")
 
         os.makedirs(filepath, exist_ok=True)
@@ -356,27 +761,31 @@ class PolarBLESignalProcessing(QThread):
 
         filename += f"_{self.timestamp}"
 
-        file = f"{filename}_acc.csv"
+        fullpath = os.path.join(filepath, f"{filename}_acc")
+
+        # columns is a copy taken by stop_recording(), the buffer is reused by the next recording
+        # the capture times on the session clock go to the alignment index, not to the file
+        session_time = columns.pop("session_time")
+        writer.submit_columns(fullpath, columns, self.save_format, lambda path: self.data_saved(path, session_time), self.save_error)
 
-        fullpath = os.path.join(filepath, file)
-        with open(fullpath, "w") as f:
-            f.write("timestamp,timestamp_polar,acc_x,acc_y,acc_z\n")
-            for t, tp, x, y, z in self.acc_data:
-                f.write(f"{t},{tp},{x},{y},{z}\n")
+    def data_saved(self, fullpath, session_time):
         print(f"Saved Polar BLE data to {fullpath}")
+        self.register_files(session_time, [fullpath])
         self.collection_finished.emit([fullpath], "PolarBLE")
 
 
-class BreathingProcessing(QThread):
+class BreathingProcessing(QThread, Acquisition):
     collection_finished = pyqtSignal(object,str)
+    save_failed = pyqtSignal(str, str)
     signalLive = pyqtSignal(float, float)
+    name = "breathing"
 
-    def __init__(self, stop_event):
+    def __init__(self, stop_event, period_in_ms=100):
         super().__init__()
         self.stop_event = stop_event
-        self.period_in_ms = 100
+        self.period_in_ms = period_in_ms
         self.collection_complete=False
-        self.sensors_data = [[], [], []]
+        self.sensors_data = None
         self.number_of_readings = 0
         self.datasets = "datasets"
 
@@ -384,13 +793,23 @@ class BreathingProcessing(QThread):
 
     def run(self):
         self.collect_data() #return when total_samples_required are collected
+        self.health.stop()
         if not self.stop_event.is_set():
             self.save_data()
         #self.stop_event.clear()
         print("DATA ACQUISITION FINISHED!")
 
 
-    def set_parameters(self, samples_number, window_duration, datasets, user_id, activity, room, target_position, timestamp):
+    def configure(self, params):
+        self.catalog = params.catalog
+        self.set_parameters(params.samples_number, params.window_duration, params.datasets, params.user_id, params.activity, params.room, params.target_position, params.timestamp, save_format=params.save_format, alignment=params.alignment)
+
+    @property
+    def progress(self):
+        return len(self.sensors_data) if self.sensors_data is not None else 0
+
+
+    def set_parameters(self, samples_number, window_duration, datasets, user_id, activity, room, target_position, timestamp, save_format="csv", alignment=None):
         self.samples_number = samples_number
         self.window_duration = window_duration
         self.datasets = datasets
@@ -399,54 +818,68 @@ class BreathingProcessing(QThread):
         self.room = room
         self.target_position = target_position
         self.timestamp = timestamp
+        self.save_format = save_format
+        self.alignment = alignment
 
         self.number_of_readings = int((self.samples_number * self.window_duration * 1000) / self.period_in_ms)
+        self.health = DeviceHealth(self.name, expected_rate=1000 / self.period_in_ms)
  
         print(f"Starting radar data acquisition for {self.user_id}...")
         print(f"Samples number: {self.samples_number}, Window duration: {self.window_duration} s")
 
 
 
+    def sensor_columns(self):
+        # force and rate of every opened belt, the first one keeps the single device names
+        columns = [("time", np.float64)]
+        for i in range(len(gdx.devices)):
+            suffix = f"_{i}" if i else ""
+            columns += [(f"force{suffix}", np.float64), (f"rate{suffix}", np.float64)]
+        return columns
+
     def collect_data(self):
         
-        self.sensors_data = [[], [], []]
+        self.sensors_data = ColumnBuffer(self.sensor_columns())
 
         self.collection_complete = False
 
+        # the belts sample on their own clock at period_in_ms from this instant
+        self.start_time = self.alignment.clock.now() if self.alignment is not None else 0.0
         gdx.start(self.period_in_ms) 
 
-        while not self.collection_complete:
-            try:
-                time = 0.0
-                print ('Collecting Data...')
+        # One reader thread per belt, the loop below only takes the merged points out
+        gdx.start_readers(self.period_in_ms)
 
-                for i in range(0,self.number_of_readings):
+        period_s = self.period_in_ms / 1000
 
-                    # This is where we are reading the list of measurements from the sensors.
-                    measurements=gdx.read() 
-                    if measurements == None: 
-                        break 
+        try:
+            print ('Collecting Data...')
 
-                    value = measurements[0]
-                    rate = measurements[1]
+            while len(self.sensors_data) < self.number_of_readings and not self.stop_event.is_set():
 
-                    #print(str(round(time,2))+ '   '+ str(round(value,2))+ '   '+ str(round(rate,2)))
+                # Points delivered by every belt since the last call, one row per point: [force, rate, force_1, rate_1, ...]
+                merged = gdx.read_merged(self.number_of_readings - len(self.sensors_data))
+                if merged is None:
+                    break
 
-                    self.signalLive.emit(float(value), float(rate))
+                times, block = merged
+                if len(block) == 0:
+                    self.stop_event.wait(period_s)
+                    continue
 
-                    self.sensors_data[0].append(time)
-                    self.sensors_data[1].append(value)
-                    self.sensors_data[2].append(rate)
+                self.sensors_data.extend(times, *block.T)
+                self.health.add_samples(len(block))
+                self.health.set_queue_depth(max(len(ring) for ring in gdx.rings))
+                self.health.dropped = sum(ring.overwritten for ring in gdx.rings)
 
-                    time = time+(self.period_in_ms / 1000)
+                self.signalLive.emit(float(block[-1, 0]), float(block[-1, 1]))
 
-                # The data collection loop is finished
-                self.collection_complete = True
-                gdx.stop()
+        except Exception as e:
+            print(f"Error: {e}")
 
-            except Exception as e:
-                print(f"Error: {e}")
-                self.collection_complete = True
+        # The data collection loop is finished
+        self.collection_complete = True
+        gdx.stop()
     
     def save_data(self):
         temp_path = os.path.join(self.datasets,"Breathing")
@@ -463,39 +896,65 @@ class BreathingProcessing(QThread):
 
         filename += f"_{self.timestamp}"
 
-        file = f"{filename}_brathing.csv"
-
-        filepath = os.path.join(temp_path,file)
+        filepath = os.path.join(temp_path, f"{filename}_brathing")
 
-        with open(filepath, mode='w', newline='', encoding='utf-8') as file_csv:
-            writer = csv.writer(file_csv)
-            writer.writerow (['time','force', 'rate'])
-            for i in range(len(self.sensors_data[0])):
-                writer.writerow([round(self.sensors_data[0][i],2),self.sensors_data[1][i],self.sensors_data[2][i]])
+        columns = {name: values.copy() for name, values in self.sensors_data.columns().items()}
+        times = self.start_time + self.sensors_data.column("time")
+        columns["time"] = np.round(columns["time"], 2)
+        writer.submit_columns(filepath, columns, self.save_format, lambda path: self.data_saved(path, times), self.save_error)
 
+    def data_saved(self, filepath, times):
         print(f"Saved Breathing BLE data to {filepath}")
+        self.register_files(times, [filepath])
         self.collection_finished.emit([filepath], "Breathing")
 
-class NanoBLESignalProcessing(QThread):
+# points per second of the live Nano plot, whatever the IMU rate
+NANO_LIVE_RATE = 20
+
+
+class NanoBLESignalProcessing(QObject, Acquisition):
     collection_finished = pyqtSignal(object,str)
+    save_failed = pyqtSignal(str, str)
     signalLive = pyqtSignal(float, float, float)
 
-    def __init__(self, stop_event, side, show_live = True):
+    def __init__(self, stop_event, side, show_live = True, address=None, service_uuid=None, char_uuid=None, rate_hz=20):
         super().__init__()
+        self.name = f"nano_{side.lower()}"
+        self.address = address
+        self.service_uuid = service_uuid
+        self.char_uuid = char_uuid
         self.stop_event = stop_event
-        self.period_in_ms = 50
+        # expected IMU rate (nano_rate_hz), sizes the buffers, the recording itself ends on the session clock
+        self.rate_hz = rate_hz
         self.collection_complete=False
-        self.sensors_data = [[], [], [], [], [], []]
+        self.sensors_data = np.zeros((0, 6))
+        self.sample_times = np.zeros(0)
         self.number_of_readings = 0
         self.samples_collected = 0
+        self.duration = 0
+        self.last_live = None
+        self.last_sequence = None
+        self.lost_packets = 0
         self.stop_async = None  # asyncio.Event
         self.datasets = "datasets"
         self.side = side        
         self.show_live = show_live
+        self.future = None
+
+    def configure(self, params):
+        self.catalog = params.catalog
+        self.set_parameters(self.address, params.datasets, params.user_id, params.activity, params.room, params.target_position, params.timestamp, params.window_duration, params.samples_number,
+                            self.service_uuid, self.char_uuid, save_format=params.save_format, alignment=params.alignment)
+
+    def done(self):
+        return self.future is not None and self.future.done()
 
-    def set_parameters(self, address, datasets, user_id, activity, room, target_position, timestamp, window_duration, samples_number, SERVICE_UUID, CHAR_UUID):
+    def set_parameters(self, address, datasets, user_id, activity, room, target_position, timestamp, window_duration, samples_number, SERVICE_UUID, CHAR_UUID, save_format="csv", alignment=None):
         self.address = address
+        self.alignment = alignment
+        self.clock = alignment.clock if alignment is not None else SessionClock()
         self.datasets = datasets
+        self.save_format = save_format
         self.user_id = user_id
         self.activity = activity
         self.room = room
@@ -507,84 +966,182 @@ class NanoBLESignalProcessing(QThread):
         self.SERVICE_UUID = SERVICE_UUID
         self.CHAR_UUID = CHAR_UUID
 
-        self.number_of_readings = int((self.samples_number * self.window_duration * 1000) / self.period_in_ms)
+        self.duration = self.samples_number * self.window_duration
+        # a little more than expected, grown in notification_handler if the IMU runs faster
+        self.number_of_readings = int(self.duration * self.rate_hz * 1.1) + 64
+        self.health = DeviceHealth(self.name, expected_rate=self.rate_hz)
 
-    def run(self):
-        asyncio.run(self._run_async())
+    def start(self):
+        # the client runs on the shared BLE loop, not on a thread of its own
+        self.future = ble.submit(self._run_async())
+
+    def wait(self):
+        if self.future is not None:
+            concurrent.futures.wait([self.future])
 
     async def _run_async(self):
         print(f"Connessione a Nano {self.side}...")
 
-        self.sensors_data = [[], [], [], [], [], []]
+        # acc_x, acc_y, acc_z, gyro_x, gyro_y, gyro_z of every sample, filled in place by the notifications
+        self.sensors_data = np.zeros((self.number_of_readings, 6), dtype=np.float64)
+        # session clock time at which the notification carrying each sample arrived
+        self.sample_times = np.zeros(self.number_of_readings, dtype=np.float64)
         self.samples_collected = 0
+        self.last_live = None
+        self.last_sequence = None
+        self.lost_packets = 0
         self.stop_async = asyncio.Event()
 
-        async with BleakClient(self.address) as client:
-            if not client.is_connected:
-                print("❌ Connessione fallita")
-                return
+        # the connection of the previous acquisition is reused, it stays open after this one
+        try:
+            client = await pool.ble_client(self.address)
+        except Exception as e:
+            print(f"❌ Connessione fallita: {e}")
+            return
 
-            print("✔ Connesso")
-            await client.start_notify(
-                self.CHAR_UUID,
-                self.notification_handler
-            )
+        print("✔ Connesso")
+        await client.start_notify(
+            self.CHAR_UUID,
+            self.notification_handler
+        )
 
-            try:
-                # ⬇️ ATTENDE finché non raggiungiamo number_of_readings
-                await self.stop_async.wait()
-            finally:
-                print("Stopping BLE notify")
+        try:
+            # ⬇️ ATTENDE la fine della sessione sul clock (o Stop Collection)
+            while not self.stop_event.is_set() and self.clock.now() < self.duration:
+                try:
+                    await asyncio.wait_for(self.stop_async.wait(), 0.1)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            print("Stopping BLE notify")
+            if client.is_connected:
                 await client.stop_notify(self.CHAR_UUID)
 
-        self.save_data()
+        self.health.stop()
+        if not self.stop_event.is_set():
+            self.save_data()
 
     def notification_handler(self, sender, data):
         try:
-            text = data.decode().strip()
-            accX, accY, accZ, gyroX, gyroY, gyroZ = map(float, text.split(","))
+            now = self.clock.now()
+            if now >= self.duration:
+                self.stop_async.set()
+                return
+            first = self.samples_collected
 
-            if self.show_live:
-                self.signalLive.emit(accX, accY, accZ)
+            if is_binary_packet(data):
+                # header + K samples x 6 int16, see src/imu_packet.py
+                header, raw = decode_packet(data)
+                self.count_lost_packets(int(header["sequence"]))
 
-            self.sensors_data[0].append(accX)
-            self.sensors_data[1].append(accY)
-            self.sensors_data[2].append(accZ)
-            self.sensors_data[3].append(gyroX)
-            self.sensors_data[4].append(gyroY)
-            self.sensors_data[5].append(gyroZ)
+                self.reserve(first + len(raw))
+                rows = self.sensors_data[first:first + len(raw)]
+                np.multiply(raw[:, :3], header["acc_scale"], out=rows[:, :3])
+                np.multiply(raw[:, 3:], header["gyro_scale"], out=rows[:, 3:])
+            else:
+                # "accX,accY,accZ,gyroX,gyroY,gyroZ" text, one sample per notification
+                self.reserve(first + 1)
+                rows = self.sensors_data[first:first + 1]
+                rows[0] = data.decode().strip().split(",")
 
-            self.samples_collected += 1
+            if len(rows) == 0:
+                return
 
-            # ✅ CONDIZIONE DI STOP AUTOMATICO
-            if self.samples_collected >= self.number_of_readings:
-                self.stop_async.set()
+            self.sample_times[first:first + len(rows)] = now
+
+            # the plot gets NANO_LIVE_RATE points per second, not every sample
+            if self.show_live and (self.last_live is None or now - self.last_live >= 1 / NANO_LIVE_RATE):
+                self.last_live = now
+                self.signalLive.emit(float(rows[-1, 0]), float(rows[-1, 1]), float(rows[-1, 2]))
+
+            self.samples_collected += len(rows)
+            self.health.add_samples(len(rows))
+            self.health.add_parse_time(self.clock.now() - now)
 
         except Exception as e:
             print("Errore parsing:", e)
+            self.health.add_malformed()
+
+    def reserve(self, rows):
+        """ Grow the sample buffers to hold rows samples, when the IMU sends more than nano_rate_hz. """
+        if rows <= self.number_of_readings:
+            return
+        self.number_of_readings = max(rows, 2 * self.number_of_readings)
+        self.sensors_data = np.resize(self.sensors_data, (self.number_of_readings, 6))
+        self.sample_times = np.resize(self.sample_times, self.number_of_readings)
+
+    def count_lost_packets(self, sequence):
+        if self.last_sequence is not None:
+            lost = (sequence - self.last_sequence - 1) & 0xFFFF
+            self.lost_packets += lost
+            self.health.add_dropped(lost)
+        self.last_sequence = sequence
 
     def save_data(self):
         folder = os.path.join(self.datasets, f"NanoBLE_{self.side}")
         os.makedirs(folder, exist_ok=True)
 
-        filename = f"{self.user_id}_{self.activity}_{self.side}_{self.timestamp}_NanoBLE_{self.side}.csv"
+        filename = f"{self.user_id}_{self.activity}_{self.side}_{self.timestamp}_NanoBLE_{self.side}"
         path = os.path.join(folder, filename)
 
-        with open(path, "w") as f:
-            f.write("acc_x,acc_y,acc_z,gyro_x,gyro_y,gyro_z\n")
-            for accX, accY, accZ, gyroX, gyroY, gyroZ in zip(*self.sensors_data):
-                f.write(f"{accX},{accY},{accZ},{gyroX},{gyroY},{gyroZ}\n")
+        if self.lost_packets:
+            print(f"Nano {self.side}: {self.lost_packets} BLE packets lost")
 
+        names = ["acc_x", "acc_y", "acc_z", "gyro_x", "gyro_y", "gyro_z"]
+        samples = self.sensors_data[:self.samples_collected]
+        columns = {name: samples[:, i].copy() for i, name in enumerate(names)}
+        sample_times = self.sample_times[:self.samples_collected].copy()
+        writer.submit_columns(path, columns, self.save_format, lambda saved_path: self.data_saved(saved_path, sample_times), self.save_error)
+
+    def data_saved(self, path, sample_times):
+        self.register_files(sample_times, [path])
         self.collection_finished.emit([path], f"Nano {self.side}")
 
 
 
         
+class InfineonProbe(QThread):
+    # sensor type, or None and the error when no radar answered
+    infineon_found = pyqtSignal(object, str)
+
+    def run(self):
+        try:
+            from ifxradarsdk.fmcw import DeviceFmcw
+
+            with DeviceFmcw() as device:
+                self.infineon_found.emit(device.get_sensor_type(), "")
+        except Exception as e:
+            self.infineon_found.emit(None, str(e))
+
+
+class SerialPortProbe(QThread):
+    ports_found = pyqtSignal(str, object)
+
+    def __init__(self, info, find_all=False, cache=None):
+        super().__init__()
+        self.info = info
+        self.find_all = find_all
+        self.cache = cache
+
+    def run(self):
+        self.ports_found.emit(self.info, find_ports(self.info, find_all=self.find_all, cache=self.cache))
+
+
+
+        
 class FormLayout(QWidget):
     def __init__(self, parent_logger=None):
         super().__init__()
         self.logger = parent_logger
 
+        self.port_cache = PortCache()
+        self.sr250Ports = []
+        # one probe at a time: a box ticked while probing queues its probe in pending_probe
+        self.port_probe = None
+        self.pending_probe = None
+        self.infineon_probe = None
+
         layout = QFormLayout()
 
         self.user_textbox = QLineEdit(placeholderText = "UserID")
@@ -660,10 +1217,18 @@ class FormLayout(QWidget):
         self.sr250rangingActive.toggled.connect(self.init_serial_sr250)
 
         
+        self.infineonActive = QCheckBox("Infineon (BGT60)")
+        self.infineonActive.setLayoutDirection(Qt.RightToLeft)
+        self.infineonActive.setStyleSheet("QCheckBox { color: crimson; }")
+        self.infineonActive.toggled.connect(self.init_infineon)
+
+        
         checkbox_layout.addWidget(self.sr250active)
         checkbox_layout.addStretch()
         checkbox_layout.addWidget(self.sr250rangingActive)
         checkbox_layout.addStretch()
+        checkbox_layout.addWidget(self.infineonActive)
+        checkbox_layout.addStretch()
 
         #checkbox_layout.setAlignment(Qt.AlignCenter)
 
@@ -743,67 +1308,99 @@ class FormLayout(QWidget):
             self.special_label.setVisible(False)
 
     
-    def get_serial_ports(self, info):
-        esp_port = None
-        ports = list_ports.comports()
-        for port in ports: 
-            try: 
-                ser = serial.Serial(port.device, timeout = 1) 
-                ser.write(b'INFO\r\n') 
-                response = ser.read(100).decode('utf-8', errors='ignore') 
-                print(f"Response: {str(response)}")
-                if info in response: 
-                    esp_port = port.device 
-                    ser.close() 
-                    print(f"Found SR250 device on port {esp_port}") 
-                    break 
-                
-            except Exception as e: 
-                print(f"Error checking port {port.device}: {e}") 
-                continue
-        return esp_port
+    def get_serial_ports(self, info, find_all=False):
+        # probing runs in a worker pool off the GUI thread, serial_ports_found() gets the result
+        self.sr250Ports = []
+        if self.port_probe is not None and self.port_probe.isRunning():
+            # the running probe keeps its reference, this one starts when it finishes
+            self.pending_probe = (info, find_all)
+            return
+
+        self.pending_probe = None
+        self.port_probe = SerialPortProbe(info, find_all=find_all, cache=self.port_cache)
+        self.port_probe.ports_found.connect(self.serial_ports_found)
+        self.port_probe.finished.connect(self.serial_probe_finished)
+        self.port_probe.start()
+
+    def serial_probe_finished(self):
+        if self.pending_probe is not None:
+            self.get_serial_ports(*self.pending_probe)
     
 
     def init_serial_sr250(self):
 
+        # the probe opens every port itself, and unticked boards must not stay open
+        pool.close_serial()
+
         if self.sr250active.isChecked() or self.sr250rangingActive.isChecked():
-            esp_port = None 
 
             if self.sr250active.isChecked():
-                esp_port = self.get_serial_ports("SR250")
+                # every SR250 connected is acquired concurrently
+                self.sr250active.setText("SR250(Mate) ...")
+                self.get_serial_ports("SR250", find_all=True)
 
             elif self.sr250rangingActive.isChecked():
-                esp_port = self.get_serial_ports("Ranging")
-            
+                self.get_serial_ports("Ranging")
+
+        else:
+            self.sr250active.setStyleSheet("QCheckBox { color: crimson; }")
+            self.sr250active.setText("SR250(Mate)")
+            self.sr250rangingActive.setStyleSheet("QCheckBox { color: crimson; }")
+            self.sr250Ports = []
+            self.pending_probe = None
 
-            if esp_port is None:
-                print("ESP device not found. Exiting.")
-                if self.sr250active.isChecked():
-                    self.sr250active.setChecked(False)
-                elif self.sr250rangingActive.isChecked():
-                    self.sr250rangingActive.setChecked(False)
-            else:
-                if self.sr250active.isChecked():
-                    self.sr250active.setStyleSheet("QCheckBox { color: green; }") 
-                elif self.sr250rangingActive.isChecked():
-                    self.sr250rangingActive.setStyleSheet("QCheckBox { color: green; }") 
 
-            self.sr250Port = esp_port
+    def serial_ports_found(self, info, esp_ports):
 
+        # the box may have been unticked while probing, or another probe be queued behind this one
+        checkbox = self.sr250active if info == "SR250" else self.sr250rangingActive
+        if not checkbox.isChecked() or self.pending_probe is not None:
+            return
+
+        if not esp_ports:
+            print("ESP device not found. Exiting.")
+            checkbox.setChecked(False)
         else:
-            if self.sr250active.isChecked():
-                self.sr250active.setStyleSheet("QCheckBox { color: crimson; }")
-            elif self.sr250rangingActive.isChecked():
-                self.sr250rangingActive.setStyleSheet("QCheckBox { color: crimson; }")
-            self.sr250Port = None
+            checkbox.setStyleSheet("QCheckBox { color: green; }") 
+            if info == "SR250":
+                self.sr250active.setText(f"SR250(Mate) x{len(esp_ports)}" if len(esp_ports) > 1 else "SR250(Mate)")
+
+        self.sr250Ports = esp_ports
+
+
+    def init_infineon(self):
+        if self.infineonActive.isChecked():
+            # opening the radar can take seconds, it is done off the GUI thread like the serial probe
+            if self.infineon_probe is None or not self.infineon_probe.isRunning():
+                print("Looking for Infineon radar...")
+                self.infineon_probe = InfineonProbe()
+                self.infineon_probe.infineon_found.connect(self.infineon_found)
+                self.infineon_probe.start()
+        else:
+            print("Infineon radar disabled.")
+            self.infineonActive.setStyleSheet("QCheckBox { color: crimson; }")
+
+        self.logger.plt[1].setVisible(self.infineonActive.isChecked() and self.logger.visualizationMode == "Heatmap")
+
+
+    def infineon_found(self, sensor_type, error):
+
+        # the box may have been unticked while probing
+        if not self.infineonActive.isChecked():
+            return
+
+        if sensor_type is None:
+            print(f"Infineon radar not found: {error}")
+            self.infineonActive.setChecked(False)
+        else:
+            print(f"Found Infineon radar {sensor_type}")
+            self.infineonActive.setStyleSheet("QCheckBox { color: green; }")
 
 
     def init_ble_cardio(self):
         if self.cardioActive.isChecked():
             print("Scanning for Polar BLE devices...")
-            devices = asyncio.run(BleakScanner.discover(timeout=5.0))
-
-            polar_device = next((d for d in devices if d.name and "Polar" in d.name), None)
+            polar_device = ble.find_device("Polar")
             if polar_device:
                 print(f"Found {polar_device.name} ({polar_device.address})")
                 self.cardio_ble_address = polar_device.address
@@ -828,9 +1425,11 @@ class FormLayout(QWidget):
 
             if gdx.open(connection=self.logger.breathing_connection, device_to_open=self.logger.breathing_address):
 
-                gdx.select_sensors([1, 2])
+                # force and respiration rate on every belt listed in breathing_address
+                gdx.select_sensors([[1, 2] for _ in gdx.devices])
                 info = gdx.device_info()
-                print("Go Direct percentage battery: " + str(info[2]) + "%")
+                for device in (info if isinstance(info[0], list) else [info]):
+                    print(f"Go Direct {device[0]} percentage battery: {device[2]}%")
                 
                 self.breathingActive.setStyleSheet("QCheckBox { color: green; }")
 
@@ -847,9 +1446,7 @@ class FormLayout(QWidget):
     def init_nano_right(self):
         if self.accRightActive.isChecked():
             print("Scanning for Nano Right BLE devices...")
-            devices = asyncio.run(BleakScanner.discover(timeout=5.0))
-
-            nano_device = next((d for d in devices if d.name and "Nano33BLE_Right" in d.name), None)
+            nano_device = ble.find_device("Nano33BLE_Right")
             if nano_device:
                 print(f"Found {nano_device.name} ({nano_device.address})")
                 self.nano_right_address = nano_device.address
@@ -867,9 +1464,7 @@ class FormLayout(QWidget):
     def init_nano_left(self):
         if self.accLeftActive.isChecked():
             print("Scanning for Nano Left BLE devices...")
-            devices = asyncio.run(BleakScanner.discover(timeout=5.0))
-
-            nano_device = next((d for d in devices if d.name and "Nano33BLE_Left" in d.name), None)
+            nano_device = ble.find_device("Nano33BLE_Left")
             if nano_device:
                 print(f"Found {nano_device.name} ({nano_device.address})")
                 self.nano_left_address = nano_device.address
@@ -901,14 +1496,10 @@ class Logger(pg.GraphicsView):
         self.setWindowTitle("TRUESENSE - UWB Dataset Collector")
         self.showMaximized()
 
-        logo = mpimg.imread('./src/assets/logo.png')
-        logo = logo.transpose((1, 0, 2))
-        logo = np.flip(logo, 1)
+        # loaded by Qt directly, y inverted so the pixmap is upright in the view box
+        logoitem = QGraphicsPixmapItem(QPixmap('./src/assets/logo.png'))
 
-        logoitem = pg.ImageItem(logo)
-        logoitem.setImage(logo)
-
-        logobox = l.addViewBox(border='w', colspan=2)
+        logobox = l.addViewBox(border='w', colspan=2, invertY=True)
         logobox.setAspectLocked()
         logobox.addItem(logoitem)
         logobox.setFixedHeight(80)
@@ -925,6 +1516,16 @@ class Logger(pg.GraphicsView):
         v_layout = QVBoxLayout(container)
         v_layout.addWidget(self.form)
 
+        # a protocol file chains the acquisitions, see run_protocol()
+        self.protocol_button = QPushButton("Run Protocol...")
+        self.protocol_button.clicked.connect(self.run_protocol)
+        v_layout.addWidget(self.protocol_button)
+
+        # acquisition health, one line per device, refreshed by update_health_overlay()
+        self.health_label = QLabel("")
+        self.health_label.setStyleSheet("font-family: monospace; font-size: 10pt;")
+        v_layout.addWidget(self.health_label)
+
         container.setLayout(v_layout)
 
         container.setObjectName("formContainer")
@@ -965,20 +1566,20 @@ class Logger(pg.GraphicsView):
         self.plt = []
 
         self.range_bins = 120
-        self.alpha = 0.9
-        self.normalization = (1 + self.alpha) / 2
-        self.decBase = np.empty((3, self.range_bins), dtype=np.complex64)
-        imgdata = np.zeros((self.range_bins, int(20 * 15)), dtype=np.float32)
+        # one background per preview channel: 0 = SR250, 1 = Infineon
+        self.declutter = Declutter(alpha=self.declutter_alpha, normalize=True, channels=2)
+        self.heatmaps = []
+        history = int(self.fps * self.heatmap_history_s)
 
-        # SR250
+        # SR250, the range of interest only
+        sr250_bins = self.sr250_bins[1] - self.sr250_bins[0]
         self.img.append(pg.ImageItem(border="w"))
-        self.img[0].setImage(imgdata)
         self.img[0].setColorMap("viridis")
+        self.heatmaps.append(RollingHeatmap(self.img[0], sr250_bins, history))
         self.plt.append(l.addPlot(anchor=(1, 0), colspan=1, col=1, rowspan=1, row=2))
         self.plt[0].addItem(self.img[0])
-        self.plt[0].setXRange(0, self.range_bins)
         self.plt[0].setTitle("SR250", size="30pt", bold=True, color="black")
-        self.plt[0].getViewBox().autoRange()
+        self.plt[0].getViewBox().setRange(xRange=(0, sr250_bins), yRange=(0, history), padding=0)
 
         #ACC
         self.acc_x_curve_data = []
@@ -1000,13 +1601,12 @@ class Logger(pg.GraphicsView):
 
         # INFINEON
         self.img.append(pg.ImageItem(border="w"))
-        self.img[1].setImage(imgdata)
         self.img[1].setColorMap("viridis")
+        self.heatmaps.append(RollingHeatmap(self.img[1], self.range_bins, history))
         self.plt.append(l.addPlot(anchor=(1, 0), colspan=1, col=1, rowspan=1, row=3))
         self.plt[1].addItem(self.img[1])
-        self.plt[1].setXRange(0, self.range_bins)
         self.plt[1].setTitle("Infineon", size="30pt", bold=True, color="black")
-        self.plt[1].getViewBox().autoRange()
+        self.plt[1].getViewBox().setRange(xRange=(0, self.range_bins), yRange=(0, history), padding=0)
         self.plt[1].hide()
 
         #BREATHING
@@ -1038,6 +1638,37 @@ class Logger(pg.GraphicsView):
 
         l.addItem(self.stop_btn_proxy, colspan=1)
 
+        for heatmap in self.heatmaps:
+            heatmap.render()
+
+        self.devices = []
+        self.alignment = None
+        self.performance = None
+        self.frame_times = FrameTimes()
+
+        # heatmaps are repainted at a fixed rate, independently of the radar frame rate
+        self.render_timer = QTimer()
+        self.render_timer.timeout.connect(self.render_heatmaps)
+        self.render_timer.start(int(1000 / self.gui_refresh_hz))
+
+        # start countdown, one tick per second, see countdown_tick()
+        self.countdown_timer = QTimer()
+        self.countdown_timer.timeout.connect(self.countdown_tick)
+        self.countdown_remaining = -1
+
+        self.health_timer = QTimer()
+        self.health_timer.timeout.connect(self.update_health_overlay)
+        self.health_timer.start(1000)
+
+        # protocol run: steps left, completion polling and rest between two acquisitions
+        self.protocol = None
+        self.protocol_steps = []
+        self.protocol_timer = QTimer()
+        self.protocol_timer.timeout.connect(self.check_protocol_step)
+        self.rest_timer = QTimer()
+        self.rest_timer.setSingleShot(True)
+        self.rest_timer.timeout.connect(self.next_protocol_step)
+
 
         self.show()
         
@@ -1078,6 +1709,19 @@ class Logger(pg.GraphicsView):
             self.breathing_connection = self.config["breathing_connection"]
             self.datasets_path = self.config["datasets_path"]
 
+            self.gui_refresh_hz = float(self.config.get("gui_refresh_hz", 20))
+            self.heatmap_history_s = float(self.config.get("heatmap_history_s", 30))
+            self.declutter_alpha = float(self.config.get("declutter_alpha", 0.9))
+            self.save_format = self.config.get("save_format", "csv")
+            self.breathing_period_ms = int(self.config.get("breathing_period_ms", 100))
+            self.nano_rate_hz = float(self.config.get("nano_rate_hz", 20))
+            self.sr250_worker_process = bool(self.config.get("sr250_worker_process", False))
+            self.radar_compression = self.config.get("radar_compression")
+            self.sr250_bins = range_of_interest(self.config.get("sr250_range_of_interest"))
+            self.sr250_storage = self.config.get("sr250_storage", "complex64")
+            # every saved recording is added to <datasets_path>/catalog.sqlite
+            self.catalog = DatasetCatalog.open(self.datasets_path)
+
             self.SERVICE_UUID = self.config["SERVICE_UUID"]
             self.CHAR_UUID = self.config["CHAR_UUID"]
 
@@ -1174,7 +1818,7 @@ class Logger(pg.GraphicsView):
         else:
             self.plot_item.hide()
             self.plt[0].show()
-            self.plt[1].hide()
+            self.plt[1].setVisible(self.form.infineonActive.isChecked())
             self.acc_plot.hide()
             self.breathing_plot.hide()
             self.visualizationMode="Heatmap"
@@ -1186,12 +1830,7 @@ class Logger(pg.GraphicsView):
 
     def create_radio_buttons(self):
         """ Creates radio buttons and places them at appropriate grid points """
-        self.positions = [
-            (150, 0), (150, 22.5), (150, 45), (150, 67.5),(150, 90),  # Row 1
-            (250, 0), (250, 22.5), (250, 45), (250, 67.5), (250, 90), # Row 2
-            (350, 0), (350, 22.5), (350, 45), (350, 67.5), (350, 90), # Row 3
-            (450, 0), (450, 22.5), (450, 45), (450, 67.5), (450, 90),   # Row 4
-        ]
+        self.positions = GRID_POSITIONS
         self.button_group = QButtonGroup(self)
 
         self.last_checked = None
@@ -1242,8 +1881,9 @@ class Logger(pg.GraphicsView):
         self.stop_event_ble = threading.Event()
         self.polar_ble = PolarBLESignalProcessing(stop_event=self.stop_event_ble)
         self.polar_ble.signalLive.connect(self.show_polar_acc)
-        self.polar_ble.set_parameters(address=address, datasets=self.datasets_path)
+        self.polar_ble.set_parameters(address=address, datasets=self.datasets_path, save_format=self.save_format)
         self.polar_ble.collection_finished.connect(self.save_message)
+        self.polar_ble.save_failed.connect(self.save_failed_message)
         self.polar_ble.start()
 
     def stop_polar_preview(self):
@@ -1258,10 +1898,17 @@ class Logger(pg.GraphicsView):
     
     def start_collection(self):
 
+        if self.countdown_timer.isActive():
+            return
+
         print("Start Collection")
         self.stop_event.clear()
 
-        if (self.form.sr250active.isChecked() or self.form.sr250rangingActive.isChecked()):
+        if (self.form.sr250active.isChecked() or self.form.sr250rangingActive.isChecked() or self.form.infineonActive.isChecked()):
+
+            if (self.form.sr250active.isChecked() or self.form.sr250rangingActive.isChecked()) and not self.form.sr250Ports:
+                QMessageBox.warning(self, "Error", "Ricerca delle porte SR250 in corso, riprova tra qualche secondo")
+                return
             
             self.username = self.form.user_textbox.text()
 
@@ -1297,75 +1944,232 @@ class Logger(pg.GraphicsView):
                     QMessageBox.warning(self, "Error", "Seleziona la posizione del target")
                     return
                 else:
-                    self.selected_pos = str(self.positions[int(self.button_group.checkedButton().text())-1]).replace(" ","")
+                    self.selected_pos = position_label(int(self.button_group.checkedButton().text()))
             else:
                 if(self.button_group.checkedButton() is None):
                     self.selected_pos= None
                 else:
-                    self.selected_pos = str(self.positions[int(self.button_group.checkedButton().text())-1]).replace(" ","")
+                    self.selected_pos = position_label(int(self.button_group.checkedButton().text()))
 
             if self.username == '':
                 self.username = "GenericUser"
 
-            time.sleep(int(self.form.timerComboBox.currentText()))
-            t = np.linspace(0, 0.5, int(44100 * 0.5), endpoint=False)
-            wave = 0.5 * np.sin(2 * np.pi * 440 * t)
-
-            # Play the generated sound
-            sd.play(wave, 44100)
-            sd.wait()  # Wait until the sound is finished
-
-            self.firstDec = [True, True, True]
-
-            if self.form.sr250active.isChecked() or self.form.sr250rangingActive.isChecked():
-                self.plt[0].setTitle("SR250", size="30pt", bold=True, color="black")
-                self.sr250_radar = SR250MateSignalProcessing(stop_event=self.stop_event, fps = self.fps, sr250active = self.form.sr250active.isChecked(), sr250rangingActive = self.form.sr250rangingActive.isChecked())
-                self.sr250_radar.collection_finished.connect(self.save_message)
-                self.sr250_radar.signalLive.connect(self.show_250_hmap)
-                if self.form.sr250rangingActive.isChecked():
-                    self.sr250_radar.signalRanging.connect(self.show_distance_sr250)
-                self.sr250_radar.set_parameters(self.form.sr250Port, self.samples_number, self.window_duration, self.datasets_path, self.username, self.activity, self.room, self.selected_pos, timestamp)
-                self.dec_frames_sr250 = np.zeros((self.sr250_radar.total_samples_required,  self.sr250_radar.range_bins), dtype=np.complex64)
-                self.sr250_samples_collected = 0
-
-            if self.form.cardioActive.isChecked():
-                self.polar_ble.start_recording(user_id=self.username, activity=self.activity, room=self.room, target_position=self.selected_pos, timestamp=timestamp, window_duration=self.window_duration, samples_number=self.samples_number)
-            if self.form.breathingActive.isChecked():
-                self.reset_breathing_plot()
-                self.breathing_band = BreathingProcessing(stop_event=self.stop_event)
-                self.breathing_band.collection_finished.connect(self.save_message)
-                self.breathing_band.signalLive.connect(self.show_breathing_signal)
-                self.breathing_band.set_parameters(self.samples_number, self.window_duration, self.datasets_path, self.username, self.activity, self.room, self.selected_pos, timestamp)    
-            if self.form.accRightActive.isChecked():
-                self.nano_right_acc = NanoBLESignalProcessing(stop_event=self.stop_event, side="Right", show_live=not self.form.cardioActive.isChecked())
-                self.nano_right_acc.collection_finished.connect(self.save_message)
-                self.nano_right_acc.signalLive.connect(self.show_nano_acc)
-                self.nano_right_acc.set_parameters(address=self.form.nano_right_address, datasets=self.datasets_path, user_id=self.username, activity=self.activity, room=self.room, target_position=self.selected_pos, timestamp=timestamp, window_duration=self.window_duration, samples_number=self.samples_number, SERVICE_UUID=self.SERVICE_UUID, CHAR_UUID=self.CHAR_UUID)
-            if self.form.accLeftActive.isChecked():
-                self.nano_left_acc = NanoBLESignalProcessing(stop_event=self.stop_event, side="Left", show_live=not (self.form.accRightActive.isChecked() or self.form.cardioActive.isChecked()))
-                self.nano_left_acc.collection_finished.connect(self.save_message)
-                self.nano_left_acc.signalLive.connect(self.show_nano_acc)
-                self.nano_left_acc.set_parameters(address=self.form.nano_left_address, datasets=self.datasets_path, user_id=self.username, activity=self.activity, room=self.room, target_position=self.selected_pos, timestamp=timestamp, window_duration=self.window_duration, samples_number=self.samples_number, SERVICE_UUID=self.SERVICE_UUID, CHAR_UUID=self.CHAR_UUID)
-
-
-            if self.form.sr250active.isChecked() or self.form.sr250rangingActive.isChecked():
-                self.sr250_radar.start()
-            if self.form.breathingActive.isChecked():
-                self.breathing_band.start()
-            if self.form.accRightActive.isChecked():
-                self.nano_right_acc.start()
-            if self.form.accLeftActive.isChecked():
-                self.nano_left_acc.start()
-
+            # the countdown runs on the GUI event loop, begin_acquisition() is called when it ends
+            self.acquisition_timestamp = timestamp
+            self.countdown_remaining = int(self.form.timerComboBox.currentText())
+            self.countdown_tick()
+            if self.countdown_remaining >= 0:
+                self.countdown_timer.start(1000)
 
         else:
 
             QMessageBox.warning(self, "Error", "Connetti almeno un device!")
             return
 
+
+    def run_protocol(self):
+
+        if self.protocol is not None or self.countdown_timer.isActive():
+            return
+
+        if not (self.form.sr250active.isChecked() or self.form.sr250rangingActive.isChecked() or self.form.infineonActive.isChecked()):
+            QMessageBox.warning(self, "Error", "Connetti almeno un device!")
+            return
+
+        if (self.form.sr250active.isChecked() or self.form.sr250rangingActive.isChecked()) and not self.form.sr250Ports:
+            QMessageBox.warning(self, "Error", "Ricerca delle porte SR250 in corso, riprova tra qualche secondo")
+            return
+
+        path, _ = QFileDialog.getOpenFileName(self, "Protocol", "", "Protocol (*.json)")
+        if not path:
+            return
+
+        try:
+            protocol = Protocol.load(path, self.config)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Error", f"Protocollo non valido: {e}")
+            return
+
+        self.protocol = protocol
+        self.protocol_steps = protocol.steps()
+        self.protocol_total = len(self.protocol_steps)
+        print(f"Protocol {path}: {self.protocol_total} acquisitions, about {protocol.duration / 60:.1f} min")
+
+        self.next_protocol_step()
+
+
+    def next_protocol_step(self):
+
+        if not self.protocol_steps:
+            print("Protocol completed")
+            self.end_protocol()
+            return
+
+        step = self.protocol_steps.pop(0)
+        protocol = self.protocol
+        print(f"Protocol step {step}")
+
+        # the form gives what the protocol file leaves out
+        self.username = protocol.user or self.form.user_textbox.text() or "GenericUser"
+        self.room = protocol.room if protocol.room is not None else self.form.room_textbox.text()
+        self.activity = step.activity
+        self.selected_pos = step.target_position
+        self.samples_number = protocol.samples_number
+        self.window_duration = protocol.window_duration
+
+        self.protocol_button.setText(f"Protocol {step.number}/{self.protocol_total}: {step.activity}")
+        self.stop_event.clear()
+
+        self.acquisition_timestamp = time.strftime("%Y%m%d-%H%M%S")
+        self.countdown_remaining = protocol.countdown_s
+        self.countdown_tick()
+        if self.countdown_remaining >= 0:
+            self.countdown_timer.start(1000)
+
+        self.protocol_timer.start(500)
+
+
+    def check_protocol_step(self):
+
+        # still counting down, a device still recording or its files not written yet
+        if self.countdown_timer.isActive() or not all(device.done() for device in self.devices) or not writer.idle:
+            return
+
+        self.protocol_timer.stop()
+
+        if self.protocol_steps:
+            step = self.protocol_steps[0]
+            where = f" at {step.target_position}" if step.position is not None else ""
+            print(f"Rest {self.protocol.rest_s:g} s, next: {step}")
+            self.protocol_button.setText(f"Rest, next {step.number}/{self.protocol_total}: {step.activity}{where}")
+            self.rest_timer.start(int(self.protocol.rest_s * 1000))
+        else:
+            self.next_protocol_step()
+
+
+    def end_protocol(self):
+        self.protocol_timer.stop()
+        self.rest_timer.stop()
+        self.protocol = None
+        self.protocol_steps = []
+        self.protocol_button.setText("Run Protocol...")
+
+
+    def countdown_tick(self):
+
+        if self.countdown_remaining > 0:
+            self.start_button.setText(f"Start in {self.countdown_remaining}...")
+            self.countdown_remaining -= 1
+            return
+
+        self.countdown_timer.stop()
+        self.countdown_remaining = -1
+        self.start_button.setText("Start Collection")
+
+        cues.play()
+        self.begin_acquisition()
+
+
+    def begin_acquisition(self):
+
+        timestamp = self.acquisition_timestamp
+
+        # a box ticked again during the countdown probes the ports anew
+        if (self.form.sr250active.isChecked() or self.form.sr250rangingActive.isChecked()) and not self.form.sr250Ports:
+            print("SR250 ports not available, acquisition not started")
+            self.devices = []
+            if self.protocol is not None:
+                self.end_protocol()
+            QMessageBox.warning(self, "Error", "Ricerca delle porte SR250 in corso, riprova tra qualche secondo")
+            return
+
+        self.declutter.reset()
+
+        # every device of this acquisition stamps its samples against the same clock
+        self.session_clock = SessionClock()
+
+        index_name = f"{self.username}_{self.activity}"
+        if self.room:
+            index_name += f"_{self.room}"
+        if self.selected_pos:
+            index_name += f"_{self.selected_pos}"
+        self.alignment = AlignmentIndex(os.path.join(self.datasets_path, "Index", f"{index_name}_{timestamp}_index.npz"), self.session_clock)
+
+        params = AcquisitionParameters(self.datasets_path, self.username, self.activity, self.room, self.selected_pos, timestamp,
+                                       self.samples_number, self.window_duration, save_format=self.save_format, alignment=self.alignment, catalog=self.catalog)
+        self.devices = []
+
+        if self.form.sr250active.isChecked() or self.form.sr250rangingActive.isChecked():
+            self.plt[0].setTitle("SR250", size="30pt", bold=True, color="black")
+            self.sr250_radars = []
+            for index, port in enumerate(self.form.sr250Ports):
+                radar = SR250MateSignalProcessing(stop_event=self.stop_event, fps = self.fps, sr250active = self.form.sr250active.isChecked(), sr250rangingActive = self.form.sr250rangingActive.isChecked(), refresh_hz=self.gui_refresh_hz, clock=self.session_clock, device_index=index, play_cue=index == 0, port=port, worker_process=self.sr250_worker_process, compression=self.radar_compression, bins=self.sr250_bins, storage=self.sr250_storage)
+                self.sr250_radars.append(radar)
+                self.devices.append(radar)
+
+            # the heatmap previews the first radar, the others are only recorded
+            self.sr250_radar = self.sr250_radars[0]
+            self.sr250_radar.signalLive.connect(self.show_250_hmap)
+            if self.form.sr250rangingActive.isChecked():
+                self.sr250_radar.signalRanging.connect(self.show_distance_sr250)
+            self.heatmaps[0].reset()
+            self.sr250_samples_collected = 0
+
+        if self.form.infineonActive.isChecked():
+            self.infineon_radar = InfineonSignalProcessing(stop_event=self.stop_event, fps=self.fps, refresh_hz=self.gui_refresh_hz, clock=self.session_clock, compression=self.radar_compression)
+            self.infineon_radar.signalLive.connect(self.show_infineon_hmap)
+            self.devices.append(self.infineon_radar)
+            self.heatmaps[1].reset()
+            self.infineon_samples_collected = 0
+
+        if self.form.cardioActive.isChecked():
+            # connected since the form opened it, collection_finished is wired in start_polar_preview()
+            self.devices.append(self.polar_ble)
+
+        if self.form.breathingActive.isChecked():
+            self.reset_breathing_plot()
+            self.breathing_band = BreathingProcessing(stop_event=self.stop_event, period_in_ms=self.breathing_period_ms)
+            self.breathing_band.signalLive.connect(self.show_breathing_signal)
+            self.devices.append(self.breathing_band)
+        if self.form.accRightActive.isChecked():
+            self.nano_right_acc = NanoBLESignalProcessing(stop_event=self.stop_event, side="Right", show_live=not self.form.cardioActive.isChecked(),
+                                                          address=self.form.nano_right_address, service_uuid=self.SERVICE_UUID, char_uuid=self.CHAR_UUID, rate_hz=self.nano_rate_hz)
+            self.nano_right_acc.signalLive.connect(self.show_nano_acc)
+            self.devices.append(self.nano_right_acc)
+        if self.form.accLeftActive.isChecked():
+            self.nano_left_acc = NanoBLESignalProcessing(stop_event=self.stop_event, side="Left", show_live=not (self.form.accRightActive.isChecked() or self.form.cardioActive.isChecked()),
+                                                         address=self.form.nano_left_address, service_uuid=self.SERVICE_UUID, char_uuid=self.CHAR_UUID, rate_hz=self.nano_rate_hz)
+            self.nano_left_acc.signalLive.connect(self.show_nano_acc)
+            self.devices.append(self.nano_left_acc)
+
+        for device in self.devices:
+            if device is not getattr(self, "polar_ble", None):
+                device.collection_finished.connect(self.save_message)
+                device.save_failed.connect(self.save_failed_message)
+            device.configure(params)
+
+        self.frame_times.reset()
+        self.performance = PerformanceReport(os.path.join(self.datasets_path, "Index", f"{index_name}_{timestamp}_performance.json"), self.devices, self.session_clock, self.frame_times)
+
+        # Every device is configured (ports open, buffers allocated): restart the session clock
+        # and begin them all at that instant, time 0 of every stream and of the alignment index
+        self.session_clock.start()
+        print(f"Acquisition started at {time.strftime('%H:%M:%S', time.localtime(self.session_clock.start_wall))}")
+
+        for device in self.devices:
+            device.begin()
+
     
     def save_message(self, file_list, device_name):
 
+        if self.performance is not None:
+            self.performance.save()
+
+        if self.protocol is not None:
+            # a protocol keeps every recording, nobody is there to answer
+            print(f"SAVED {device_name}")
+            return
+
         msg_box =  QMessageBox()
 
         msg_box.setWindowTitle("Conferma salvataggio")
@@ -1385,134 +2189,96 @@ class Logger(pg.GraphicsView):
 
             for f in file_list:
                 os.remove(f)
+            self.catalog.remove(file_list)
+            # the index must not point readers to the deleted files
+            if self.alignment is not None:
+                self.alignment.remove(file_list)
             print("DISCARDED")
 
 
 
-    def stop_collection(self):
-        print("Stop Collection")
-
-        self.stop_event.set()
+    def save_failed_message(self, device_name, error):
 
-        if hasattr(self, "polar_ble"):
-            self.polar_ble.stop_recording()
+        if self.performance is not None:
+            self.performance.save()
 
+        print(f"NOT SAVED {device_name}: {error}")
+        if self.protocol is not None:
+            # the protocol goes on, the console keeps the error
+            return
 
-    def decluttering(self, cir, rx):
+        QMessageBox.critical(self, "Errore", f"Salvataggio dei dati di {device_name} non riuscito: {error}")
 
-        cir_abs = cir
 
-        if self.firstDec[rx]:
+    def stop_collection(self):
+        print("Stop Collection")
 
-            self.decBase[rx] = cir_abs
+        if self.protocol is not None:
+            print("Protocol aborted")
+            self.end_protocol()
 
-            self.firstDec[rx] = False
-            return cir_abs*0
-        
-        else:
+        if self.countdown_timer.isActive():
+            # nothing was started yet
+            self.countdown_timer.stop()
+            self.countdown_remaining = -1
+            self.start_button.setText("Start Collection")
+            return
 
-            res = ((self.alpha * self.decBase[rx]) + (1-self.alpha)*cir_abs)
-            self.decBase[rx] = res
+        self.stop_event.set()
 
-            res = (cir_abs - res)
+        if hasattr(self, "polar_ble"):
+            self.polar_ble.stop_recording()
 
-            return res
-        
-    def decluttering_alt (self, cir, rx):
-        cir_abs = cir
+        if self.performance is not None:
+            self.performance.save()
 
-        if self.firstDec[rx]:
 
-            self.decBase[rx] = cir_abs
+    @pyqtSlot()
+    def show_250_hmap(self):
+        snapshot = self.sr250_radar.preview.acquire()
+        if snapshot is None:
+            return
 
-            self.firstDec[rx] = False
-            return cir_abs*0
-        
-        else:
+        start, block = snapshot
+        dec_block = self.declutter.process_block(block[:, 0, :], channel=0)
+        self.sr250_samples_collected += len(block)
+        self.sr250_radar.preview.release()
 
-            res = (cir - self.decBase[rx]) * self.normalization
+        self.heatmaps[0].push(dec_block)
 
-            self.decBase[rx] = self.decBase[rx] * self.alpha + cir * (1-self.alpha)
+    def render_heatmaps(self):
+        t0 = time.perf_counter()
+        for heatmap in self.heatmaps:
+            heatmap.render()
+        self.frame_times.add(time.perf_counter() - t0)
 
-            return res
+    def update_health_overlay(self):
+        lines = [device.health.summary() for device in self.devices if device.health is not None]
+        if not lines:
+            return
+        lines.append(self.frame_times.summary())
+        lines.append(writer.summary())
 
-        
-    def fft_spectrum(self, mat, range_window):
-        # Calculate fft spectrum
-        # mat:          chirp data
-        # range_window: window applied on input data before fft
-
-        # received data 'mat' is in matrix form for a single receive antenna
-        # each row contains 'num_samples' for a single chirp
-        # total number of rows = 'num_chirps'
-
-        # -------------------------------------------------
-        # Step 1 - remove DC bias from samples
-        # -------------------------------------------------
-        [num_chirps, num_samples] = np.shape(mat)
-
-        # helpful in zero padding for high resolution FFT.
-        # compute row (chirp) averages
-        avgs = np.average(mat, 1).reshape(num_chirps, 1)
-
-        # de-bias values
-        mat = mat - avgs
-        # -------------------------------------------------
-        # Step 2 - Windowing the Data
-        # -------------------------------------------------
-        mat = np.multiply(mat, range_window)
-
-        # -------------------------------------------------
-        # Step 3 - add zero padding here
-        # -------------------------------------------------
-        zp1 = np.pad(mat, ((0, 0), (0, num_samples)), 'constant')
-
-        # -------------------------------------------------
-        # Step 4 - Compute FFT for distance information
-        # -------------------------------------------------
-        range_fft = np.fft.fft(zp1) / num_samples
-
-        # ignore the redundant info in negative spectrum
-        # compensate energy by doubling magnitude
-        range_fft = 2 * range_fft[:, range(int(num_samples))]
-
-        return range_fft
-    
-    @pyqtSlot()
-    def show_250_hmap(self):
-        self.dec_frames_sr250[self.sr250_samples_collected,:] = self.decluttering_alt(self.sr250_radar.frames[self.sr250_samples_collected,0,:], 0)
-        self.sr250_samples_collected += 1
-        self.img[0].setImage(np.abs(self.dec_frames_sr250).T, autolevels = True)
-        self.plt[0].getViewBox().autoRange()
+        degraded = any(device.health.degraded for device in self.devices if device.health is not None)
+        self.health_label.setStyleSheet(f"font-family: monospace; font-size: 10pt; color: {'red' if degraded else 'black'};")
+        self.health_label.setText("\n".join(lines))
 
     @pyqtSlot(int)
     def show_distance_sr250(self, distance):
         self.plt[0].setTitle(f"SR250 ({distance} cm)", size="30pt", bold=True, color="black")
 
-    @pyqtSlot()
-    def show_250_dev_hmap(self):
-
-        self.dec_frames_sr250dev[self.sr250dev_samples_collected,:] = self.decluttering_alt(self.sr250dev_radar.frames[self.sr250dev_samples_collected,0,:], 1)
-        self.sr250dev_samples_collected += 1
-        self.img[0].setImage(np.abs(self.dec_frames_sr250dev).T, autolevels = True)
-        self.plt[0].getViewBox().autoRange()
-
-
-
     @pyqtSlot()
     def show_infineon_hmap(self):
+        snapshot = self.infineon_radar.preview.acquire()
+        if snapshot is None:
+            return
 
-        self.range_window = signal.windows.blackmanharris(128).reshape(1, 128)
-        
-        data = 2 * self.infineon_radar.frames[self.infineon_samples_collected,0,:] / 4095 -1.0 
-        data = self.fft_spectrum(data, self.range_window)
-        data = np.divide(data.sum(axis=0), 4)
-        self.dec_frames_infineon[self.infineon_samples_collected,:] = self.decluttering_alt(data[:120],2)
-        
-        self.infineon_samples_collected += 1
+        start, block = snapshot
+        dec_block = self.declutter.process_block(block[:, 0, :], channel=1)
+        self.infineon_samples_collected += len(block)
+        self.infineon_radar.preview.release()
 
-        self.img[1].setImage(np.abs(self.dec_frames_infineon).T, autolevels = True)
-        self.plt[1].getViewBox().autoRange()
+        self.heatmaps[1].push(dec_block)
 
     @pyqtSlot(float, float, float)
     def show_polar_acc(self, acc_x, acc_y, acc_z):
@@ -1537,13 +2303,14 @@ class Logger(pg.GraphicsView):
         self.acc_y_curve_data.append(acc_y)
         self.acc_z_curve_data.append(acc_z)
 
-        # 15 s * 20 Hz = 300
-        if len(self.acc_x_curve_data) > 300:
-            self.acc_x_curve_data = self.acc_x_curve_data[-300:]
-            self.acc_y_curve_data = self.acc_y_curve_data[-300:]
-            self.acc_z_curve_data = self.acc_z_curve_data[-300:]
+        # 15 s at NANO_LIVE_RATE, the Nano thread thins its samples out to that rate
+        history = 15 * NANO_LIVE_RATE
+        if len(self.acc_x_curve_data) > history:
+            self.acc_x_curve_data = self.acc_x_curve_data[-history:]
+            self.acc_y_curve_data = self.acc_y_curve_data[-history:]
+            self.acc_z_curve_data = self.acc_z_curve_data[-history:]
         n = len(self.acc_x_curve_data)
-        t = np.linspace(-n / 20, 0, n, endpoint=False)
+        t = np.linspace(-n / NANO_LIVE_RATE, 0, n, endpoint=False)
         self.acc_curve_x.setData(t, self.acc_x_curve_data)
         self.acc_curve_y.setData(t, self.acc_y_curve_data)
         self.acc_curve_z.setData(t, self.acc_z_curve_data)
@@ -1568,14 +2335,298 @@ class Logger(pg.GraphicsView):
         self.breathing_rate_data.clear()
 
 
+class HeadlessRecorder:
+    """ Records with the same acquisition classes as Logger, without any window.
+
+    Devices come from the command line, the other parameters from logger_conf.json. Each
+    session lasts samples_number * window_duration seconds, every file is kept (there is
+    no save dialog) and throughput is printed every stats_interval seconds.
+    """
+
+    def __init__(self, args, config):
+        self.args = args
+        self.config = config
+        self.stop_event = threading.Event()
+
+        self.fps = float(config["fps"])
+        self.datasets_path = config["datasets_path"]
+        self.save_format = config.get("save_format", "csv")
+        self.breathing_period_ms = int(config.get("breathing_period_ms", 100))
+        self.nano_rate_hz = float(config.get("nano_rate_hz", 20))
+        self.sr250_worker_process = bool(config.get("sr250_worker_process", False))
+        self.radar_compression = config.get("radar_compression")
+        self.sr250_bins = range_of_interest(config.get("sr250_range_of_interest"))
+        self.sr250_storage = config.get("sr250_storage", "complex64")
+
+        os.makedirs(self.datasets_path, exist_ok=True)
+        self.catalog = DatasetCatalog.open(self.datasets_path)
+
+        if args.duration:
+            self.samples_number, self.window_duration = 1, args.duration
+        else:
+            self.samples_number, self.window_duration = args.samples_number, args.window_duration
+        self.user, self.room = args.user, args.room
+        self.protocol = None
+
+        self.sr250_ports = []
+        self.ble_addresses = {}
+        self.polar = None
+        self.saved = []
+        self.failed = []
+
+    def saved_files(self, file_list, device_name):
+        print(f"{device_name}: saved {', '.join(str(f) for f in file_list)}")
+        self.saved.extend(file_list)
+
+    def save_failed(self, device_name, error):
+        print(f"{device_name}: NOT SAVED, {error}")
+        self.failed.append(device_name)
+
+    def open_devices(self):
+        args = self.args
+
+        if args.sr250 is not None:
+            info = "Ranging" if args.ranging else "SR250"
+            self.sr250_ports = args.sr250 or find_ports(info, find_all=not args.ranging, cache=PortCache())
+            if not self.sr250_ports:
+                raise RuntimeError(f"No {info} device found")
+
+        if args.breathing:
+            if not gdx.open(connection=self.config["breathing_connection"], device_to_open=self.config["breathing_address"]):
+                raise RuntimeError("No Go Direct device found")
+            gdx.select_sensors([[1, 2] for _ in gdx.devices])
+
+        for side, address, name in (("Right", args.nano_right, "Nano33BLE_Right"), ("Left", args.nano_left, "Nano33BLE_Left")):
+            if address is None:
+                continue
+            if not address:
+                device = ble.find_device(name)
+                if device is None:
+                    raise RuntimeError(f"No {name} device found")
+                address = device.address
+            self.ble_addresses[side] = address
+
+        if args.polar is not None:
+            address = args.polar
+            if not address:
+                device = ble.find_device("Polar")
+                if device is None:
+                    raise RuntimeError("No Polar device found")
+                address = device.address
+
+            self.polar = PolarBLESignalProcessing(stop_event=self.stop_event)
+            self.polar.collection_finished.connect(self.saved_files, Qt.DirectConnection)
+            self.polar.save_failed.connect(self.save_failed, Qt.DirectConnection)
+            self.polar.set_parameters(address=address, datasets=self.datasets_path, save_format=self.save_format)
+            self.polar.start()
+
+            deadline = time.monotonic() + 30
+            while not self.polar.connected and time.monotonic() < deadline:
+                time.sleep(0.1)
+            if not self.polar.connected:
+                raise RuntimeError("Polar connection failed")
+
+    def record_session(self, label, activity, target_position=None):
+        args = self.args
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        session_clock = SessionClock()
+
+        index_name = f"{self.user}_{activity}"
+        if self.room:
+            index_name += f"_{self.room}"
+        alignment = AlignmentIndex(os.path.join(self.datasets_path, "Index", f"{index_name}_{timestamp}_index.npz"), session_clock)
+
+        params = AcquisitionParameters(self.datasets_path, self.user, activity, self.room, target_position, timestamp,
+                                       self.samples_number, self.window_duration, save_format=self.save_format, alignment=alignment, catalog=self.catalog)
+        devices = []
+
+        for index, port in enumerate(self.sr250_ports):
+            devices.append(SR250MateSignalProcessing(stop_event=self.stop_event, fps=self.fps, sr250active=not args.ranging, sr250rangingActive=args.ranging, clock=session_clock, device_index=index, play_cue=False, port=port, worker_process=self.sr250_worker_process, compression=self.radar_compression, bins=self.sr250_bins, storage=self.sr250_storage))
+
+        if args.infineon:
+            devices.append(InfineonSignalProcessing(stop_event=self.stop_event, fps=self.fps, clock=session_clock, compression=self.radar_compression))
+
+        if args.breathing:
+            devices.append(BreathingProcessing(stop_event=self.stop_event, period_in_ms=self.breathing_period_ms))
+
+        for side, address in self.ble_addresses.items():
+            devices.append(NanoBLESignalProcessing(stop_event=self.stop_event, side=side, show_live=False, address=address, service_uuid=self.config["SERVICE_UUID"], char_uuid=self.config["CHAR_UUID"], rate_hz=self.nano_rate_hz))
+
+        for device in devices:
+            # no event loop runs here, the slot is called in the thread that saved the files
+            device.collection_finished.connect(self.saved_files, Qt.DirectConnection)
+            device.save_failed.connect(self.save_failed, Qt.DirectConnection)
+
+        if self.polar is not None:
+            # connected once in open_devices(), its slot is already wired
+            devices.append(self.polar)
+
+        for device in devices:
+            device.configure(params)
+
+        performance = PerformanceReport(os.path.join(self.datasets_path, "Index", f"{index_name}_{timestamp}_performance.json"), devices, session_clock)
+
+        print(f"{label}: {params.duration} s, {', '.join(device.name for device in devices)}")
+
+        session_clock.start()
+        for device in devices:
+            device.begin()
+
+        end = session_clock.start_monotonic + params.duration
+        previous = dict.fromkeys((device.name for device in devices), 0)
+        last = time.monotonic()
+
+        try:
+            while not self.stop_event.is_set():
+                # the Polar recording is ended below, its QTimer has no event loop to fire on here
+                if time.monotonic() >= end and all(device.done() for device in devices if device is not self.polar):
+                    break
+
+                self.stop_event.wait(min(args.stats_interval, 0.5))
+
+                now = time.monotonic()
+                if now - last >= args.stats_interval:
+                    self.print_stats(devices, previous, now - last, session_clock.now())
+                    last = now
+
+        except KeyboardInterrupt:
+            print("Interrupted, the current session is not saved")
+            self.stop_event.set()
+
+        if self.polar is not None:
+            if self.stop_event.is_set():
+                self.polar.stop()
+            else:
+                self.polar.stop_recording()
+
+        for device in devices:
+            if device is not self.polar:
+                device.wait()
+
+        # the files of this session are on disk before the next one starts
+        writer.wait()
+        print(writer.summary())
+
+        performance.save()
+        for device in devices:
+            if device.health.degraded:
+                print(f"Warning: {device.health.summary()}")
+
+    def print_stats(self, devices, previous, elapsed, session_time):
+        line = [f"{session_time:7.1f} s"]
+        for device in devices:
+            count = device.progress
+            line.append(f"{device.name} {count} ({(count - previous[device.name]) / elapsed:.1f}/s)")
+            previous[device.name] = count
+        print(" | ".join(line), flush=True)
+
+    def load_protocol(self, path):
+        self.protocol = protocol = Protocol.load(path, self.config)
+        self.samples_number, self.window_duration = protocol.samples_number, protocol.window_duration
+        if protocol.user:
+            self.user = protocol.user
+        if protocol.room is not None:
+            self.room = protocol.room
+
+    def run_protocol(self):
+        steps = self.protocol.steps()
+        print(f"Protocol: {len(steps)} acquisitions, about {self.protocol.duration / 60:.1f} min")
+
+        for step in steps:
+            if self.stop_event.is_set():
+                break
+            if step.number > 1 and self.protocol.rest_s > 0:
+                print(f"Rest {self.protocol.rest_s:g} s, next: {step}")
+                # the devices stay connected through the pool, only the recording pauses
+                if self.stop_event.wait(self.protocol.rest_s):
+                    break
+            self.record_session(f"Step {step}", step.activity, step.target_position)
+
+    def run(self):
+        status = 0
+        try:
+            if self.args.protocol:
+                # an invalid file fails before any device is opened
+                self.load_protocol(self.args.protocol)
+            self.open_devices()
+            if self.protocol is not None:
+                self.run_protocol()
+            else:
+                for session in range(self.args.sessions):
+                    if self.stop_event.is_set():
+                        break
+                    self.record_session(f"Session {session + 1}/{self.args.sessions}", self.args.activity)
+        except (RuntimeError, ValueError, OSError) as e:
+            print(f"Error: {e}")
+            status = 1
+        finally:
+            if self.polar is not None:
+                self.stop_event.set()
+                self.polar.wait()
+            if self.args.breathing:
+                gdx.close()
+            pool.close()
+            ble.stop()
+            writer.stop()
+
+        if self.failed:
+            print(f"Recordings not saved: {', '.join(self.failed)}")
+            status = 1
+
+        return status
+
+
+
+
 if __name__ == '__main__':
 
+    startup_profile.mark("imports")
+
+    parser = argparse.ArgumentParser(description="Records radar, breathing belt and wearable data. Without --headless the GUI is opened and the devices are chosen there.")
+    parser.add_argument(startup_profile.FLAG, action="store_true", help="Open the GUI once, print the startup times and the slowest imports, then quit.")
+    parser.add_argument("--headless", action="store_true", help="Record without GUI, with the devices given below and the settings of src/logger_conf.json.")
+    headless = parser.add_argument_group("headless recording")
+    headless.add_argument("--sr250", nargs="*", metavar="PORT", help="Record the SR250 boards on these ports, every board found if no port is given.")
+    headless.add_argument("--ranging", action="store_true", help="The SR250 board runs the ranging firmware.")
+    headless.add_argument("--infineon", action="store_true", help="Record the Infineon BGT60 radar.")
+    headless.add_argument("--breathing", action="store_true", help="Record the Go Direct breathing belts of breathing_address.")
+    headless.add_argument("--polar", nargs="?", const="", metavar="ADDRESS", help="Record a Polar sensor, the first one found if no address is given.")
+    headless.add_argument("--nano-right", nargs="?", const="", metavar="ADDRESS", help="Record the right Nano IMU, found by name if no address is given.")
+    headless.add_argument("--nano-left", nargs="?", const="", metavar="ADDRESS", help="Record the left Nano IMU, found by name if no address is given.")
+    headless.add_argument("--user", default="GenericUser")
+    headless.add_argument("--activity", default="Headless")
+    headless.add_argument("--room", default="")
+    headless.add_argument("--duration", type=int, help="Seconds per session, same as --samples-number 1 --window-duration DURATION.")
+    headless.add_argument("--samples-number", type=int, default=1)
+    headless.add_argument("--window-duration", type=int, default=60, help="Seconds per window.")
+    headless.add_argument("--sessions", type=int, default=1, help="Number of recordings made one after the other.")
+    headless.add_argument("--protocol", metavar="FILE", help="Run the acquisitions of a protocol JSON file, see readme.md. Its activities, positions and durations replace the options above.")
+    headless.add_argument("--stats-interval", type=float, default=5.0, help="Seconds between two throughput reports.")
+    args = parser.parse_args()
+
+    if args.headless:
+        # QThread and the Polar timer want an application object, but no event loop is run
+        app = QCoreApplication(sys.argv)
+
+        with open('src/logger_conf.json', 'r') as f:
+            config = json.load(f)
+
+        sys.exit(HeadlessRecorder(args, config).run())
+
     app = pg.mkQApp("TRUESENSE - UWB Dataset Collector")
 
     with open('src/UbuntuStyle.css', 'r') as f:
         app.setStyleSheet(f.read())
 
+    # the registry fills while the window opens, ticking a BLE device is then immediate
+    ble.start_scanning()
+
     view = Logger()
+    # slots run in connection order, the BLE clients are disconnected before the loop stops
+    app.aboutToQuit.connect(pool.close)
+    app.aboutToQuit.connect(ble.stop)
+    # the recordings still queued are written before the process exits
+    app.aboutToQuit.connect(writer.stop)
 
         # Force fullscreen workaround
     main_window = QMainWindow()
@@ -1588,4 +2639,9 @@ if __name__ == '__main__':
     main_window.show()                              # Important: show before setting state
     main_window.setWindowState(Qt.WindowMaximized)  # Explicitly set window state
 
+    startup_profile.mark("window built")
+    if startup_profile.enabled():
+        # the first event loop iteration paints the window, report and quit right after it
+        QTimer.singleShot(0, lambda: (startup_profile.mark("first frame"), app.quit()))
+
     pg.exec()
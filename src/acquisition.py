@@ -0,0 +1,87 @@
+class AcquisitionParameters:
+    """ Everything a device needs to record one acquisition, whatever the device. """
+
+    def __init__(self, datasets, user_id, activity, room, target_position, timestamp, samples_number, window_duration, save_format="csv", alignment=None, catalog=None):
+        self.datasets = datasets
+        self.user_id = user_id
+        self.activity = activity
+        self.room = room
+        self.target_position = target_position
+        self.timestamp = timestamp
+        self.samples_number = samples_number
+        self.window_duration = window_duration
+        self.save_format = save_format
+        self.alignment = alignment
+        self.catalog = catalog
+
+    @property
+    def duration(self):
+        return self.samples_number * self.window_duration
+
+
+class Acquisition:
+    """ Interface shared by the device acquisition classes of logger.py.
+
+    A recording is driven the same way for every device:
+
+        device.configure(params)  # AcquisitionParameters, opens the device and allocates buffers
+        device.begin()            # at the session start instant
+        device.progress           # samples collected so far
+        device.health             # src.health.DeviceHealth counters, set by configure()
+        device.done()             # True once the device has stopped
+        device.stop()             # early stop, nothing is saved
+        device.wait()
+
+    and device.collection_finished(file_list, device_name) is emitted once the files are
+    saved. The defaults below fit the QThread based devices with a stop_event and a
+    samples_collected counter, the others override them.
+    """
+
+    name = "device"
+    health = None
+    alignment = None
+    catalog = None
+
+    def configure(self, params):
+        raise NotImplementedError
+
+    def begin(self):
+        if self.health is not None:
+            self.health.start()
+        self.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def done(self):
+        return self.isFinished()
+
+    @property
+    def progress(self):
+        return self.samples_collected
+
+    def save_error(self, error):
+        """ on_error of the writer jobs: the recording could not be written, save_failed tells the GUI. """
+        self.save_failed.emit(self.name, str(error))
+
+    def register_files(self, times, files):
+        """ Add saved files to the alignment index and to the dataset catalog, once written.
+
+        times are the capture times of the saved rows on the session clock, the stream of the
+        index and the device of the catalog are named after the device.
+        """
+        if self.alignment is not None:
+            self.alignment.add(self.name, times, files)
+
+        if self.catalog is not None:
+            clock = self.alignment.clock if self.alignment is not None else None
+            try:
+                self.catalog.add(self.name, files, len(times), self.user_id, self.activity, self.room, self.target_position, self.timestamp,
+                                 fps=self.health.expected_rate if self.health is not None else None,
+                                 achieved_rate=self.health.rate if self.health is not None else None,
+                                 window_duration=self.window_duration, samples_number=self.samples_number,
+                                 session_start=clock.start_wall if clock is not None else None,
+                                 alignment_index=self.alignment.path if self.alignment is not None else None)
+            except Exception as e:
+                # the recording is saved, only its catalog entry is missing
+                print(f"Could not add {self.name} to the catalog: {e}")
@@ -0,0 +1,92 @@
+import os
+import threading
+
+import numpy as np
+
+
+class AlignmentIndex:
+    """ Capture time of every sample of every stream of one acquisition, on the session clock.
+
+    Each device adds its stream when it saves its recording: one timestamp per saved row
+    (frame, IMU sample, belt point) in seconds since SessionClock.start(), and the files the
+    rows were written to. The index is rewritten as a small .npz after every add(), so it
+    is complete as soon as the last device has saved.
+
+    Consumers load it with AlignmentIndex.load() and cut synchronized windows with a binary
+    search on each stream instead of assuming sampling rates:
+
+        index = AlignmentIndex.load("datasets/Index/user_walk_20250101-120000_index.npz")
+        rows = index.windows(12.0, 17.0)  # stream name -> slice of rows in [12 s, 17 s)
+        radar = np.load(index.files["sr250"][0])[rows["sr250"]]
+    """
+
+    def __init__(self, path, clock=None):
+        self.path = path
+        self.clock = clock
+        self.session_start = clock.start_wall if clock is not None else None
+        self.times = {}
+        self.files = {}
+        self._lock = threading.Lock()
+
+    @property
+    def streams(self):
+        return list(self.times)
+
+    def add(self, stream, times, files=()):
+        """ Record the capture times of a stream and save the index. """
+        with self._lock:
+            self.times[stream] = np.asarray(times, dtype=np.float64)
+            self.files[stream] = [str(f) for f in files]
+            self.save()
+
+    def remove(self, files):
+        """ Drop the streams saved in deleted files, and the index file once no stream is left. """
+        removed = {os.path.abspath(f) for f in files}
+        with self._lock:
+            for stream in [s for s, saved in self.files.items() if removed & {os.path.abspath(f) for f in saved}]:
+                del self.times[stream]
+                del self.files[stream]
+
+            if self.times:
+                self.save()
+            elif os.path.exists(self.path):
+                os.remove(self.path)
+
+    def save(self):
+        if self.clock is not None:
+            # the clock may have been restarted at the acquisition start since __init__
+            self.session_start = self.clock.start_wall
+
+        arrays = {
+            "streams": np.array(self.streams, dtype=str),
+            "session_start": np.float64(self.session_start if self.session_start is not None else np.nan),
+        }
+        for stream in self.times:
+            arrays[f"{stream}.times"] = self.times[stream]
+            arrays[f"{stream}.files"] = np.array(self.files[stream], dtype=str)
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        # write aside and rename, a reader never sees a half written index
+        temp_path = self.path + ".tmp.npz"
+        np.savez(temp_path, **arrays)
+        os.replace(temp_path, self.path)
+
+    @classmethod
+    def load(cls, path):
+        index = cls(path)
+        with np.load(path) as data:
+            index.session_start = float(data["session_start"])
+            for stream in data["streams"]:
+                stream = str(stream)
+                index.times[stream] = data[f"{stream}.times"]
+                index.files[stream] = [str(f) for f in data[f"{stream}.files"]]
+        return index
+
+    def window(self, stream, start, stop):
+        """ Slice of the rows of stream captured in [start, stop) seconds. """
+        times = self.times[stream]
+        return slice(int(np.searchsorted(times, start, "left")), int(np.searchsorted(times, stop, "left")))
+
+    def windows(self, start, stop):
+        return {stream: self.window(stream, start, stop) for stream in self.times}
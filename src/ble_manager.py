@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+
+
+class BLEManager:
+    """ One thread running one asyncio event loop shared by every BLE device of the logger.
+
+    Scans, Bleak clients and notification callbacks all live on this loop, instead of each
+    acquisition thread spinning up its own loop with asyncio.run(). Coroutines are handed
+    over from any thread with submit(), notification callbacks run on the manager thread.
+    The thread is started on first use.
+
+    start_scanning() keeps a scanner running on the same loop and fills registry with every
+    advertising device, its RSSI and last-seen time, so devices can be looked up instantly
+    (find_device, known_device) and connected to without a new discovery.
+
+    Example:
+        ble = BLEManager()
+        ble.start_scanning()
+        polar = ble.find_device("Polar")  # BLEDevice, immediate once advertised
+        future = ble.submit(stream(polar))  # concurrent.futures.Future
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.thread = None
+        self._lock = threading.Lock()
+
+        # address -> BLEDeviceRecord of every device seen by the background scanner
+        self.registry = {}
+        self._registry_lock = threading.Lock()
+        self._scan_future = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+
+            ready = threading.Event()
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self._run, args=(ready,), name="ble-manager", daemon=True)
+            self.thread.start()
+            ready.wait()
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(ready.set)
+        self.loop.run_forever()
+
+        # cancel what is still pending (e.g. a stream that was never stopped) before closing
+        pending = asyncio.all_tasks(self.loop)
+        for task in pending:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self.loop.close()
+
+    def submit(self, coro):
+        """ Schedule coro on the manager loop, returns a concurrent.futures.Future. """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(_report_error)
+        return future
+
+    def run(self, coro, timeout=None):
+        """ Run coro on the manager loop and block the calling thread until it returns. """
+        return self.submit(coro).result(timeout)
+
+    def discover(self, timeout=5.0):
+        return self.run(_discover(timeout))
+
+    def start_scanning(self):
+        """ Keep scanning in the background and record every advertising device in registry. """
+        if self._scan_future is None or self._scan_future.done():
+            self._scan_future = self.submit(self._scan())
+
+    def stop_scanning(self):
+        if self._scan_future is not None:
+            self._scan_future.cancel()
+            self._scan_future = None
+
+    async def _scan(self):
+        # bleak is imported here, on the manager thread, not while the GUI starts
+        from bleak import BleakScanner
+
+        scanner = BleakScanner(detection_callback=self._detected)
+        await scanner.start()
+        try:
+            await asyncio.Event().wait()  # until cancelled
+        finally:
+            await scanner.stop()
+
+    def _detected(self, device, advertisement):
+        with self._registry_lock:
+            record = self.registry.get(device.address)
+            if record is None:
+                record = self.registry[device.address] = BLEDeviceRecord(device)
+            record.update(device, advertisement.rssi)
+
+    def known_device(self, address, max_age=None):
+        """ BLEDevice of address from the registry, None if not seen (within max_age seconds).
+        Clients connect to it directly, without a discovery. """
+        with self._registry_lock:
+            record = self.registry.get(address)
+        if record is None or (max_age is not None and record.age > max_age):
+            return None
+        return record.device
+
+    def find_device(self, name, timeout=5.0, max_age=30.0):
+        """ Most recently seen device whose name contains name. If the registry has none,
+        wait up to timeout seconds for the scanner to see one. Returns a BLEDevice or None. """
+        self.start_scanning()
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._registry_lock:
+                matches = [r for r in self.registry.values() if r.name and name in r.name and r.age <= max_age]
+            if matches:
+                return min(matches, key=lambda r: r.age).device
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.1)
+
+    def devices(self, max_age=30.0):
+        """ Snapshot of the registry: records seen within max_age seconds, strongest first. """
+        with self._registry_lock:
+            records = [r for r in self.registry.values() if r.age <= max_age]
+        return sorted(records, key=lambda r: r.rssi, reverse=True)
+
+    def stop(self):
+        with self._lock:
+            if not self.running:
+                return
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.thread = None
+
+
+class BLEDeviceRecord:
+    """ Registry entry of BLEManager: the BLEDevice to connect to, its RSSI and when it was last seen. """
+
+    def __init__(self, device):
+        self.device = device
+        self.name = device.name
+        self.address = device.address
+        self.rssi = None
+        self.last_seen = 0.0
+
+    def update(self, device, rssi):
+        self.device = device
+        self.name = device.name or self.name
+        self.rssi = rssi
+        self.last_seen = time.monotonic()
+
+    @property
+    def age(self):
+        return time.monotonic() - self.last_seen
+
+    def __repr__(self):
+        return f"{self.name} ({self.address}, {self.rssi} dBm, {self.age:.1f} s ago)"
+
+
+async def _discover(timeout):
+    from bleak import BleakScanner
+
+    return await BleakScanner.discover(timeout=timeout)
+
+
+def _report_error(future):
+    # nobody may ever call result() on a streaming task, print its failure here
+    if not future.cancelled() and future.exception() is not None:
+        print(f"BLE error: {future.exception()}")
@@ -0,0 +1,173 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+CATALOG_NAME = "catalog.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT,
+    activity TEXT,
+    room TEXT,
+    target_position TEXT,
+    timestamp TEXT,
+    device TEXT,
+    fps REAL,
+    achieved_rate REAL,
+    window_duration REAL,
+    samples_number INTEGER,
+    frames INTEGER,
+    session_start REAL,
+    alignment_index TEXT,
+    saved_at REAL
+);
+CREATE TABLE IF NOT EXISTS files (
+    recording_id INTEGER REFERENCES recordings(id),
+    path TEXT,
+    shape TEXT,
+    dtype TEXT,
+    size_bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS recordings_user ON recordings(user_id);
+CREATE INDEX IF NOT EXISTS recordings_activity ON recordings(activity);
+CREATE INDEX IF NOT EXISTS recordings_room ON recordings(room);
+CREATE INDEX IF NOT EXISTS recordings_device ON recordings(device);
+CREATE INDEX IF NOT EXISTS recordings_timestamp ON recordings(timestamp);
+CREATE INDEX IF NOT EXISTS files_recording ON files(recording_id);
+"""
+
+# the columns select() can filter on with an equality
+FILTERS = ("user_id", "activity", "room", "target_position", "device", "timestamp")
+
+
+class DatasetCatalog:
+    """ SQLite catalog of every recording saved under a datasets folder.
+
+    The logger adds one row per device and acquisition with its metadata, and one row per
+    file with its shape, so subsets are selected with an indexed query instead of parsing
+    file names. File paths are stored relative to the folder of the catalog, the folder
+    can be moved or copied as a whole.
+
+    Example:
+        catalog = DatasetCatalog.open("datasets")
+        for rec in catalog.select(activity="Right arm up", device="sr250"):
+            frames = np.load(rec["files"][0])
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.root = os.path.dirname(os.path.abspath(path))
+        # add() is called from the writer thread, select() from anywhere
+        self._lock = threading.Lock()
+
+        os.makedirs(self.root, exist_ok=True)
+        with self._connect() as db:
+            # readers (notebooks) do not block the logger while it adds recordings
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, datasets_path):
+        return cls(os.path.join(datasets_path, CATALOG_NAME))
+
+    @contextmanager
+    def _connect(self):
+        """ A connection per call, committed and closed at the end: callers are on different threads. """
+        db = sqlite3.connect(self.path, timeout=10)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def add(self, device, files, frames, user_id, activity, room=None, target_position=None, timestamp=None,
+            fps=None, achieved_rate=None, window_duration=None, samples_number=None, session_start=None, alignment_index=None):
+        """ Add one saved recording and its files, returns its id. """
+        rows = [(os.path.relpath(os.path.abspath(f), self.root), *_describe(f)) for f in files]
+
+        with self._lock, self._connect() as db:
+            cursor = db.execute(
+                "INSERT INTO recordings (user_id, activity, room, target_position, timestamp, device, fps, achieved_rate,"
+                " window_duration, samples_number, frames, session_start, alignment_index, saved_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (user_id, activity, room or None, target_position or None, timestamp, device, fps, achieved_rate,
+                 window_duration, samples_number, int(frames), session_start,
+                 os.path.relpath(os.path.abspath(alignment_index), self.root) if alignment_index else None, time.time()))
+            recording_id = cursor.lastrowid
+            db.executemany("INSERT INTO files (recording_id, path, shape, dtype, size_bytes) VALUES (?, ?, ?, ?, ?)",
+                           [(recording_id, *row) for row in rows])
+        return recording_id
+
+    def remove(self, files):
+        """ Forget deleted files, and the recordings left without any file. """
+        paths = [os.path.relpath(os.path.abspath(f), self.root) for f in files]
+
+        with self._lock, self._connect() as db:
+            db.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in paths])
+            db.execute("DELETE FROM recordings WHERE id NOT IN (SELECT recording_id FROM files)")
+
+    def select(self, since=None, until=None, **filters):
+        """ Recordings matching every filter, oldest first, as dicts with a "files" list.
+
+        filters are equalities on FILTERS, a list or tuple matches any of its values.
+        since and until bound the acquisition timestamp ("%Y%m%d-%H%M%S" strings).
+        """
+        where, args = [], []
+        for name, value in filters.items():
+            if name not in FILTERS:
+                raise ValueError(f"Unknown filter {name}, use one of {FILTERS}")
+            if isinstance(value, (list, tuple)):
+                where.append(f"{name} IN ({', '.join('?' * len(value))})")
+                args.extend(value)
+            else:
+                where.append(f"{name} = ?")
+                args.append(value)
+        if since is not None:
+            where.append("timestamp >= ?")
+            args.append(since)
+        if until is not None:
+            where.append("timestamp < ?")
+            args.append(until)
+
+        query = "SELECT * FROM recordings"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY timestamp, id"
+
+        with self._connect() as db:
+            recordings = [dict(row) for row in db.execute(query, args)]
+            for rec in recordings:
+                files = db.execute("SELECT path, shape FROM files WHERE recording_id = ? ORDER BY rowid", (rec["id"],)).fetchall()
+                rec["files"] = [os.path.join(self.root, row["path"]) for row in files]
+                rec["shapes"] = [tuple(json.loads(row["shape"])) if row["shape"] else None for row in files]
+        return recordings
+
+    def query(self, sql, args=()):
+        """ Any read-only SQL on the recordings and files tables, rows as dicts. """
+        with self._connect() as db:
+            return [dict(row) for row in db.execute(sql, args)]
+
+
+def _describe(path):
+    """ (shape as JSON, dtype, size) of a saved file, without loading its data. """
+    size = os.path.getsize(path) if os.path.exists(path) else None
+    try:
+        if path.endswith(".npy"):
+            array = np.load(path, mmap_mode="r")
+            return json.dumps(array.shape), str(array.dtype), size
+        if path.endswith(".h5"):
+            import h5py
+
+            with h5py.File(path, "r") as f:
+                if "data" in f:
+                    return json.dumps(f["data"].shape), str(f["data"].dtype), size
+    except Exception:
+        pass
+    return None, None, size
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+class ColumnBuffer:
+    """ Growable columnar sample buffer backed by one typed NumPy array per column.
+
+    Unlike a deque of tuples it never drops samples and stores each value unboxed
+    (e.g. 8 bytes for a float64 timestamp, 2 bytes for an int16 axis). Capacity grows
+    by doubling, in multiples of chunk_size, so appends are amortized O(1).
+
+    Example:
+        buf = ColumnBuffer([("timestamp", np.float64), ("acc_x", np.int16)])
+        buf.append(t, x)
+        buf.column("acc_x")  # view on the samples collected so far
+    """
+
+    def __init__(self, columns, chunk_size=4096):
+        self.names = [name for name, _ in columns]
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in columns}
+        self.chunk_size = chunk_size
+        self._capacity = chunk_size
+        self._size = 0
+        self._data = {name: np.empty(chunk_size, dtype=dtype) for name, dtype in self.dtypes.items()}
+        self._arrays = [self._data[name] for name in self.names]
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return sum(self.dtypes[name].itemsize for name in self.names) * self._size
+
+    def _reserve(self, n):
+        required = self._size + n
+        if required <= self._capacity:
+            return
+
+        capacity = max(2 * self._capacity, required)
+        capacity = -(-capacity // self.chunk_size) * self.chunk_size
+
+        for name in self.names:
+            grown = np.empty(capacity, dtype=self.dtypes[name])
+            grown[:self._size] = self._data[name][:self._size]
+            self._data[name] = grown
+
+        self._arrays = [self._data[name] for name in self.names]
+        self._capacity = capacity
+
+    def append(self, *values):
+        """ Append one sample, one value per column in declaration order. """
+        if self._size == self._capacity:
+            self._reserve(1)
+
+        i = self._size
+        for array, value in zip(self._arrays, values):
+            array[i] = value
+        self._size = i + 1
+
+    def extend(self, *columns):
+        """ Append a block of samples, one array per column in declaration order. """
+        n = len(columns[0])
+        self._reserve(n)
+
+        i = self._size
+        for array, values in zip(self._arrays, columns):
+            array[i:i + n] = values
+        self._size = i + n
+
+    def column(self, name):
+        return self._data[name][:self._size]
+
+    def columns(self):
+        """ Dict name -> view of every column, in declaration order. """
+        size = self._size
+        return {name: self._data[name][:size] for name in self.names}
+
+    def clear(self):
+        self._size = 0
@@ -0,0 +1,22 @@
+import numpy as np
+
+SAMPLE_RATE = 44100
+
+
+def tone(frequency=440, duration=0.5, amplitude=0.5, sample_rate=SAMPLE_RATE):
+    t = np.arange(int(sample_rate * duration)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+# synthesized once at import, the acquisition start and end play the same beep
+CUE = tone()
+
+
+def play(cue=CUE):
+    """ Start playing a cue and return immediately, sounddevice plays it on its own thread. """
+    try:
+        import sounddevice as sd
+
+        sd.play(cue, SAMPLE_RATE)
+    except Exception as e:
+        print(f"Could not play the cue: {e}")
@@ -0,0 +1,119 @@
+import numpy as np
+
+ALPHA = 0.9
+
+
+def declutter_gain(alpha, normalize=True):
+    """ Gain applied to the difference between a frame and the previous background.
+
+    normalize=True  -> (1 + alpha) / 2, the Logger.decluttering_alt / log_viewer variant
+    normalize=False -> alpha, equivalent to subtracting the already updated background
+                       (Logger.decluttering and the arduino_tflite firmware)
+    """
+    return (1 + alpha) / 2 if normalize else alpha
+
+
+def exponential_background(frames, alpha, base, block=64):
+    """ background[n] = alpha * background[n-1] + (1 - alpha) * frames[n], background[-1] = base
+
+    The recursion is evaluated block by block in closed form: inside a block of L frames
+    the background is a lower-triangular (L, L) matrix times the block plus the decayed
+    background of the previous block, so each block is a single BLAS matmul over every
+    bin (and antenna) at once. Complex frames are filtered through their float view.
+    """
+    num_frames = len(frames)
+    flat = np.ascontiguousarray(frames).reshape(num_frames, -1)
+    real_dtype = np.finfo(flat.dtype).dtype
+    columns = flat.view(real_dtype) if np.iscomplexobj(flat) else flat
+
+    k = np.arange(block)
+    lower = np.tril(alpha ** np.subtract.outer(k, k).clip(0)) * (1 - alpha)
+    lower = lower.astype(real_dtype)
+    decay = (alpha ** (k + 1)).astype(real_dtype)[:, np.newaxis]
+
+    background = np.empty_like(columns)
+    prev = np.ascontiguousarray(base, dtype=flat.dtype).reshape(-1)
+    prev = prev.view(real_dtype) if np.iscomplexobj(flat) else prev
+
+    for start in range(0, num_frames, block):
+        chunk = columns[start:start + block]
+        n = len(chunk)
+        result = lower[:n, :n] @ chunk + decay[:n] * prev
+        background[start:start + n] = result
+        prev = result[-1]
+
+    if np.iscomplexobj(flat):
+        background = background.view(flat.dtype)
+    return background.reshape(frames.shape)
+
+
+def declutter_batch(frames, alpha=ALPHA, normalize=True, base=None):
+    """ Exponential background subtraction on a whole (frames, ...) array in one vectorized pass.
+
+        background[n] = alpha * background[n-1] + (1 - alpha) * frames[n]
+        out[n]        = gain * (frames[n] - background[n-1])
+
+    Args:
+        frames: array with time on axis 0, e.g. (frames, bins) or (frames, antennas, bins)
+        alpha (float): background forgetting factor
+        normalize (bool): see declutter_gain()
+        base: background left by a previous call (shape frames.shape[1:]). When None the
+            first frame initializes the background and its output is zero.
+
+    Returns:
+        (out, base): decluttered frames, and the background to pass to the next call to
+        continue the stream.
+    """
+    frames = np.asarray(frames)
+    if not np.issubdtype(frames.dtype, np.inexact):
+        frames = frames.astype(np.float32)
+    if len(frames) == 0:
+        return frames.copy(), base
+
+    if base is None:
+        base = frames[0]
+
+    base = np.asarray(base, dtype=frames.dtype)
+    background = exponential_background(frames, alpha, base)
+
+    out = np.empty_like(frames)
+    out[0] = frames[0] - base
+    out[1:] = frames[1:] - background[:-1]
+    out *= declutter_gain(alpha, normalize)
+
+    return out, background[-1].copy()
+
+
+class Declutter:
+    """ Streaming form of declutter_batch(), keeping one background per channel
+    (e.g. one per antenna or per radar).
+    """
+
+    def __init__(self, alpha=ALPHA, normalize=True, channels=1):
+        self.alpha = alpha
+        self.normalize = normalize
+        self.gain = declutter_gain(alpha, normalize)
+        self.base = [None] * channels
+
+    def reset(self, channel=None):
+        if channel is None:
+            self.base = [None] * len(self.base)
+        else:
+            self.base[channel] = None
+
+    def process(self, cir, channel=0):
+        """ Declutter a single frame. """
+        base = self.base[channel]
+
+        if base is None:
+            self.base[channel] = np.array(cir, copy=True)
+            return cir * 0
+
+        res = (cir - base) * self.gain
+        self.base[channel] = base * self.alpha + cir * (1 - self.alpha)
+        return res
+
+    def process_block(self, frames, channel=0):
+        """ Declutter a (frames, ...) block, continuing the stream of the channel. """
+        out, self.base[channel] = declutter_batch(frames, self.alpha, self.normalize, self.base[channel])
+        return out
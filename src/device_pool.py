@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+import serial
+
+
+class DevicePool:
+    """ Serial ports and BLE clients kept open from one acquisition to the next.
+
+    serial(port) returns the open port of a previous acquisition when it still answers,
+    and only opens (or reopens) it otherwise. ble_client(address), awaited on the BLE
+    manager loop, does the same for Bleak clients. A new activity then starts without
+    reconnecting, and close() releases everything once, when the logger quits.
+
+    Example:
+        pool = DevicePool(ble)
+        ser = pool.serial("COM5")                       # opened
+        ser = pool.serial("COM5")                       # same object, already open
+        client = await pool.ble_client(address)         # on the BLE loop
+        pool.close()
+    """
+
+    def __init__(self, ble, serial_timeout=1):
+        self.ble = ble
+        self.serial_timeout = serial_timeout
+        self.ports = {}
+        self.clients = {}
+        self._lock = threading.Lock()
+        self._client_locks = {}
+
+    def serial(self, port):
+        with self._lock:
+            ser = self.ports.get(port)
+            if ser is not None and _serial_healthy(ser):
+                # what the board sent after the last STOP belongs to no acquisition
+                ser.reset_input_buffer()
+                return ser
+
+            if ser is not None:
+                print(f"Serial port {port} lost, reopening it")
+                _close_quietly(ser)
+
+            ser = serial.Serial(port, timeout=self.serial_timeout)
+            self.ports[port] = ser
+            return ser
+
+    def close_serial(self, keep=()):
+        """ Close the pooled ports, except those in keep. """
+        with self._lock:
+            for port in [p for p in self.ports if p not in keep]:
+                _close_quietly(self.ports.pop(port))
+
+    async def ble_client(self, address):
+        """ Connected BleakClient for address, to await on the BLE manager loop. """
+        from bleak import BleakClient
+
+        lock = self._client_locks.setdefault(address, asyncio.Lock())
+        async with lock:
+            client = self.clients.get(address)
+            if client is not None and client.is_connected:
+                return client
+
+            if client is not None:
+                print(f"BLE device {address} disconnected, reconnecting")
+
+            # a BLEDevice from the scanner registry skips the discovery BleakClient does for an address
+            client = BleakClient(self.ble.known_device(address) or address)
+            await client.connect()
+            self.clients[address] = client
+            return client
+
+    async def _disconnect_all(self):
+        clients, self.clients = list(self.clients.values()), {}
+        for client in clients:
+            try:
+                await client.disconnect()
+            except Exception as e:
+                print(f"Error during BLE disconnect: {e}")
+
+    def close(self, timeout=5.0):
+        """ Close every port and disconnect every client, before the BLE manager stops. """
+        self.close_serial()
+
+        if self.clients and self.ble.running:
+            try:
+                self.ble.run(self._disconnect_all(), timeout)
+            except Exception as e:
+                print(f"Error closing BLE clients: {e}")
+
+
+def _serial_healthy(ser):
+    try:
+        # in_waiting queries the driver, it fails once the adapter was unplugged
+        return ser.is_open and ser.in_waiting >= 0
+    except (OSError, serial.SerialException):
+        return False
+
+
+def _close_quietly(ser):
+    try:
+        ser.close()
+    except (OSError, serial.SerialException):
+        pass
@@ -0,0 +1,104 @@
+import threading
+from collections import deque
+
+import numpy as np
+
+
+class FrameQueue:
+    """ Bounded single-producer / single-consumer queue between a reader thread and
+    a processing thread.
+
+    deque.append() and deque.popleft() are atomic under the GIL, so neither side ever
+    takes a lock. When the queue is full the newest item is dropped and counted, the
+    producer never blocks.
+    """
+
+    def __init__(self, maxlen=4096):
+        self.maxlen = maxlen
+        self.dropped = 0
+        self._items = deque()
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        if len(self._items) >= self.maxlen:
+            self.dropped += 1
+            return False
+        self._items.append(item)
+        return True
+
+    def drain(self, max_items=None):
+        """ Pop every pending item (or at most max_items) in arrival order. """
+        items = []
+        popleft = self._items.popleft
+        while max_items is None or len(items) < max_items:
+            try:
+                items.append(popleft())
+            except IndexError:
+                break
+        return items
+
+    def clear(self):
+        self._items.clear()
+        self.dropped = 0
+
+
+class DoubleBuffer:
+    """ Two preallocated frame blocks used to hand batches of frames to the GUI.
+
+    The producer appends into the back block and calls publish() at the refresh rate.
+    publish() only swaps when the GUI has released the previous front block, so the
+    GUI can read a front block without copying while the producer keeps filling the
+    other one. Frames that do not fit in the back block are dropped from the preview
+    only (they are still stored by the acquisition thread).
+    """
+
+    def __init__(self, capacity, shape, dtype):
+        self.capacity = capacity
+        self._blocks = [np.zeros((capacity,) + tuple(shape), dtype=dtype) for _ in range(2)]
+        self._back = 0
+        self._back_count = 0
+        self._back_start = 0
+        self._front_count = 0
+        self._front_start = 0
+        self._front_ready = False
+        self._lock = threading.Lock()
+        self.skipped = 0
+
+    def write(self, start, block):
+        """ Append block (frames starting at sample index start) to the back buffer. """
+        with self._lock:
+            if self._back_count == 0:
+                self._back_start = start
+            free = self.capacity - self._back_count
+            n = min(free, len(block))
+            self._blocks[self._back][self._back_count:self._back_count + n] = block[:n]
+            self._back_count += n
+            self.skipped += len(block) - n
+
+    def publish(self):
+        """ Swap back and front if the GUI is done with the front block. Returns True
+        when a new block is available for acquire(). """
+        with self._lock:
+            if self._front_ready or self._back_count == 0:
+                return False
+            self._front_count = self._back_count
+            self._front_start = self._back_start
+            self._back = 1 - self._back
+            self._back_count = 0
+            self._front_ready = True
+            return True
+
+    def acquire(self):
+        """ Returns (start, frames) for the published block, or None. The frames view
+        stays valid until release() is called. """
+        with self._lock:
+            if not self._front_ready:
+                return None
+            front = self._blocks[1 - self._back]
+            return self._front_start, front[:self._front_count]
+
+    def release(self):
+        with self._lock:
+            self._front_ready = False
@@ -1,13 +1,20 @@
 # To use Go Direct sensors with Python 3 you must install the godirect module
 # with the command: pip3 install godirect
 
-from godirect import GoDirect
-
 import logging
+import threading
 import time    
+from collections import deque
+
+import numpy as np
+
+from src.ring_buffer import RingBuffer
 
 logging.basicConfig()
 
+# a reader gives up on a device that sends nothing for this long
+READER_TIMEOUT_S = 5.0
+
 
 class gdx:
 
@@ -22,14 +29,28 @@ class gdx:
     device_sensors = []
     # enabled_sensors - a 2D list of the sensor objects that have been enabled for data collection.
     enabled_sensors = []
-    # buffer - a 2D list to store the excess data from a sensor when multi-points are collected from a read due to fast collection.
+    # buffer - a list of deques to store the excess data from a sensor when multi-points are collected from a read due to fast collection.
     buffer = []
+    # readers - a list of per-device reader threads started by start_readers(), empty when not running.
+    readers = []
+    # rings - a list of RingBuffer objects, one per device, filled by the readers with rows [time, sensor values...].
+    rings = []
+    # readers_stop - the event that tells the reader threads to return.
+    readers_stop = threading.Event()
     # ble_open - this is a flag to keep track of when godirect is asked to open ble, to make sure it's not asked twice.
     ble_open = False
 
     def __init__(self):
 
-        self.godirect = GoDirect(use_ble=False, use_usb=False) 
+        # GoDirect is created on first use, so that building gdx does not load its USB and BLE backends
+        self._godirect = None
+
+    @property
+    def godirect(self):
+        if self._godirect is None:
+            from godirect import GoDirect
+            self._godirect = GoDirect(use_ble=False, use_usb=False) 
+        return self._godirect
 
     def get_version(self):
         """ get the version of the gdx module
@@ -479,7 +500,7 @@ class gdx:
         if gdx.buffer:
             i = 0
             for i in range(len(gdx.buffer)):
-                pop_values = gdx.buffer[i].pop(0)
+                pop_values = gdx.buffer[i].popleft()
                 retvalues.append(pop_values)
             # if this was the last value in the buffer, clear the list so that it is not a list of empty lists
             if not gdx.buffer[0]:
@@ -497,16 +518,13 @@ class gdx:
                     if sensors:
                         for sensor in sensors: 
                             # The sensor.values call may read one sensor value, or multiple sensor values (if fast sampling)
-                            values[:] = sensor.values
-                            # Pull the first value off the values list
-                            pop_values = values.pop(0)
+                            values = sensor.values
                             # Build a list of each sensors' first value (this builds the return list)
-                            retvalues.append(pop_values)
-                            # Build a list of lists for each sensors data that is not returned and put it in the buffer
-                            if values:
-                                gdx.buffer.append(values)
+                            retvalues.append(values[0])
+                            # Build a list of deques for each sensors data that is not returned and put it in the buffer
+                            if len(values) > 1:
+                                gdx.buffer.append(deque(values[1:]))
                             sensor.clear()
-                            values = []
                 i +=1  
   
         if not retvalues:
@@ -531,11 +549,97 @@ class gdx:
                 if sensors:
                     for sensor in sensors: 
                         # The sensor.values call may read one sensor value, or multiple sensor values (if fast sampling)
-                        retvalues[:] = sensor.values
+                        retvalues.append(list(sensor.values))
                         sensor.clear()
             i +=1
         return retvalues
 
+    def start_readers(self, period, clock=None, seconds=60):
+        """ Service every opened device with its own reader thread, so that a slow device does
+        not stall the others. Call it after start(). Each reader puts the points of its device
+        in a ring buffer holding `seconds` of data, use read_merged() to take them out.
+
+        Args:
+            period (int): the sampling period given to start(), in milliseconds
+            clock: object with a now() method in seconds (e.g. SessionClock). The first point
+            of every device is stamped with clock.now() at this call and the following ones
+            every period after it. If None the timestamps start at 0.
+        """
+
+        if not gdx.devices:
+            print("start_readers() - no device connected")
+            return
+
+        self.stop_readers()
+
+        period_s = period / 1000
+        start_time = clock.now() if clock is not None else 0.0
+        capacity = max(1024, int(seconds / period_s))
+
+        gdx.readers_stop = threading.Event()
+        gdx.rings = []
+        gdx.readers = []
+        i = 0
+        while i < len(gdx.devices):
+            sensors = gdx.enabled_sensors[i]
+            ring = RingBuffer(capacity, 1 + len(sensors))
+            reader = threading.Thread(target=_device_reader, args=(gdx.devices[i], sensors, ring, start_time, period_s, gdx.readers_stop), daemon=True)
+            gdx.rings.append(ring)
+            gdx.readers.append(reader)
+            i += 1
+
+        for reader in gdx.readers:
+            reader.start()
+
+    def read_merged(self, max_rows=None):
+        """ Take the points collected by the readers of start_readers(), aligned across devices.
+
+        Row k of every device is the k-th point since start, so only as many rows as the
+        slowest device has delivered are returned, the rest stays in the ring buffers.
+
+        Returns:
+            times, values: a 1D NumPy array with the timestamp of every row (seconds) and a
+            2D NumPy array of shape (rows, sensors), one column per enabled sensor in the
+            order of enabled_sensor_info(). None if the readers are not running, or once a
+            device stopped delivering and every row it gave was taken out.
+        """
+
+        if not gdx.readers:
+            print("read_merged() - readers not started")
+            return None
+
+        num_rows = min(len(ring) for ring in gdx.rings)
+        if num_rows == 0:
+            # no more aligned rows can come once a reader gave up on its device
+            for ring in gdx.rings:
+                if ring.closed and len(ring) == 0:
+                    print(f"read_merged() - {ring.error or 'reader stopped'}")
+                    return None
+        if max_rows is not None:
+            num_rows = min(num_rows, max_rows)
+
+        blocks = [ring.read(num_rows) for ring in gdx.rings]
+        values = np.hstack([block[:, 1:] for block in blocks])
+
+        return blocks[0][:, 0], values
+
+    def stop_readers(self):
+        """ Stop the reader threads of start_readers(). Points still in the ring buffers are dropped.
+        """
+
+        if not gdx.readers:
+            return
+
+        gdx.readers_stop.set()
+        for reader in gdx.readers:
+            reader.join()
+
+        overwritten = sum(ring.overwritten for ring in gdx.rings)
+        if overwritten:
+            print(f"stop_readers() - {overwritten} points overwritten because read_merged() was not called often enough")
+
+        gdx.readers = []
+        gdx.rings = []
  
     def stop(self):
         """ Stop data collection on the enabled sensors.
@@ -545,6 +649,9 @@ class gdx:
         if not gdx.devices:
             print("stop() - no device connected")
             return
+
+        # the readers must not call read() on a stopped device
+        self.stop_readers()
         
         i = 0
         while i < len(gdx.devices):
@@ -561,6 +668,8 @@ class gdx:
             print("close() - no device connected")
             return
 
+        self.stop_readers()
+
         i = 0
         while i < len(gdx.devices):
             #print("close device ", i, sep="")
@@ -734,4 +843,53 @@ class gdx:
                 device_rssi = device.rssi
                 discovered_ble_devices.append([device_name, device_rssi])
             
-        return discovered_ble_devices
\ No newline at end of file
+        return discovered_ble_devices
+
+
+def _device_reader(device, sensors, ring, start_time, period_s, stop_event):
+    """ Reader thread of one device for gdx.start_readers().
+
+    The ring is closed when the device fails or sends nothing for READER_TIMEOUT_S (or ten
+    periods if longer), read_merged() then ends the collection like read() returning None.
+    """
+
+    try:
+        _read_device(device, sensors, ring, start_time, period_s, stop_event)
+    except Exception as e:
+        ring.close(f"{device}: {e}")
+    else:
+        if not ring.closed:
+            ring.close()
+
+
+def _read_device(device, sensors, ring, start_time, period_s, stop_event):
+    pending = [[] for _ in sensors]
+    index = 0
+    timeout = max(READER_TIMEOUT_S, 10 * period_s)
+    last_data = time.monotonic()
+
+    while not stop_event.is_set():
+        # blocks until the device sends a measurement packet or its read timeout expires
+        if not device.read():
+            if time.monotonic() - last_data > timeout:
+                ring.close(f"{device}: no data for {timeout:g} s")
+                return
+            continue
+        last_data = time.monotonic()
+
+        for values, sensor in zip(pending, sensors):
+            values.extend(sensor.values)
+            sensor.clear()
+
+        num_points = min(len(values) for values in pending) if pending else 0
+        if num_points == 0:
+            continue
+
+        rows = np.empty((num_points, 1 + len(sensors)), dtype=np.float64)
+        rows[:, 0] = start_time + (index + np.arange(num_points)) * period_s
+        for column, values in enumerate(pending, 1):
+            rows[:, column] = values[:num_points]
+            del values[:num_points]
+
+        ring.write(rows)
+        index += num_points
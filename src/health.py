@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+import time
+
+# below this fraction of the expected rate a device is reported as degraded
+MIN_RATE_RATIO = 0.9
+
+
+class DeviceHealth:
+    """ Counters of one device during an acquisition, updated by its acquisition thread.
+
+    Each counter has a single writer (the reader thread, the BLE loop or the acquisition
+    thread) and is only read by the overlay and the report, so plain attributes are enough.
+
+    Example:
+        health = DeviceHealth("sr250", expected_rate=10)
+        health.start()
+        health.add_samples(len(frames))
+        health.add_malformed()
+        health.snapshot()  # dict of the counters and the achieved rate
+    """
+
+    def __init__(self, name, expected_rate=None):
+        self.name = name
+        self.expected_rate = expected_rate
+        self.samples = 0
+        self.dropped = 0
+        self.malformed = 0
+        self.parse_calls = 0
+        self.parse_time = 0.0
+        self.parse_time_max = 0.0
+        self.queue_depth = 0
+        self.queue_depth_max = 0
+        self.started = None
+        self.stopped = None
+
+    def start(self):
+        self.started = time.monotonic()
+        self.stopped = None
+
+    def stop(self):
+        if self.started is not None and self.stopped is None:
+            self.stopped = time.monotonic()
+
+    def add_samples(self, n=1):
+        self.samples += n
+
+    def add_dropped(self, n=1):
+        self.dropped += n
+
+    def add_malformed(self, n=1):
+        self.malformed += n
+
+    def add_parse_time(self, seconds):
+        self.parse_calls += 1
+        self.parse_time += seconds
+        self.parse_time_max = max(self.parse_time_max, seconds)
+
+    def set_queue_depth(self, depth):
+        self.queue_depth = depth
+        self.queue_depth_max = max(self.queue_depth_max, depth)
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.stopped or time.monotonic()) - self.started
+
+    @property
+    def rate(self):
+        elapsed = self.elapsed
+        return self.samples / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def degraded(self):
+        if self.dropped or self.malformed:
+            return True
+        # the first second is mostly connection and buffering
+        if self.expected_rate and self.elapsed > 1.0:
+            return self.rate < MIN_RATE_RATIO * self.expected_rate
+        return False
+
+    def snapshot(self):
+        return {
+            "expected_rate": self.expected_rate,
+            "achieved_rate": round(self.rate, 3),
+            "samples": self.samples,
+            "dropped": self.dropped,
+            "malformed": self.malformed,
+            "parse_ms_mean": round(1e3 * self.parse_time / self.parse_calls, 3) if self.parse_calls else None,
+            "parse_ms_max": round(1e3 * self.parse_time_max, 3),
+            "queue_depth_max": self.queue_depth_max,
+            "duration_s": round(self.elapsed, 3),
+            "degraded": self.degraded,
+        }
+
+    def summary(self):
+        """ One short line for the live overlay. """
+        expected = f"/{self.expected_rate:g}" if self.expected_rate else ""
+        line = f"{self.name:<11} {self.rate:6.1f}{expected} Hz  drop {self.dropped}  bad {self.malformed}"
+        if self.parse_calls:
+            line += f"  parse {1e3 * self.parse_time / self.parse_calls:.2f} ms"
+        return line + f"  queue {self.queue_depth}"
+
+
+class FrameTimes:
+    """ Duration of the GUI repaints, to tell a slow GUI from a slow device. """
+
+    def __init__(self):
+        self.frames = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds):
+        self.frames += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    def reset(self):
+        self.__init__()
+
+    def snapshot(self):
+        return {
+            "frames": self.frames,
+            "frame_ms_mean": round(1e3 * self.total / self.frames, 3) if self.frames else None,
+            "frame_ms_max": round(1e3 * self.max, 3),
+        }
+
+    def summary(self):
+        mean = 1e3 * self.total / self.frames if self.frames else 0.0
+        return f"{'gui':<11} frame {mean:.1f} ms  max {1e3 * self.max:.1f} ms"
+
+
+class PerformanceReport:
+    """ JSON report of the device counters of one acquisition, next to its alignment index.
+
+    save() writes the current counters of every device, it is called each time a device has
+    saved its files and once more at the end, so the report is there even for an aborted
+    acquisition.
+    """
+
+    def __init__(self, path, devices, clock=None, frame_times=None):
+        self.path = path
+        self.devices = devices
+        self.clock = clock
+        self.frame_times = frame_times
+        self._lock = threading.Lock()
+
+    def to_dict(self):
+        report = {
+            "session_start": self.clock.start_wall if self.clock is not None else None,
+            "devices": {device.health.name: device.health.snapshot() for device in self.devices if device.health is not None},
+        }
+        if self.frame_times is not None:
+            report["gui"] = self.frame_times.snapshot()
+        report["degraded"] = any(d["degraded"] for d in report["devices"].values())
+        return report
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+            # write aside and rename, like the alignment index
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w") as f:
+                json.dump(self.to_dict(), f, indent=4)
+            os.replace(temp_path, self.path)
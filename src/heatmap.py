@@ -0,0 +1,69 @@
+import numpy as np
+
+
+class RollingHeatmap:
+    """ Rolling range/time heatmap drawn into a pyqtgraph ImageItem.
+
+    The last `history` frames are kept in a preallocated ring image of shape
+    (range_bins, history). push() only writes the new columns and render() copies the
+    ring into display order and calls setImage with cached levels, so the cost of a
+    repaint does not depend on how long the recording has been running. render() is
+    meant to be driven by a fixed-rate QTimer and does nothing when no frame arrived.
+    """
+
+    def __init__(self, image_item, range_bins, history, level_refresh=40):
+        self.image_item = image_item
+        self.range_bins = range_bins
+        self.history = history
+        # levels are recomputed on the whole ring every level_refresh repaints, and grown
+        # immediately when a new block exceeds them
+        self.level_refresh = level_refresh
+
+        self.ring = np.zeros((range_bins, history), dtype=np.float32)
+        self.display = np.zeros((range_bins, history), dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        self.ring[:] = 0
+        self.head = 0
+        self.levels = None
+        self.renders = 0
+        self.dirty = True
+
+    def push(self, block):
+        """ Append a (frames, range_bins) block, complex or magnitude. """
+        if len(block) == 0:
+            return
+
+        mag = np.abs(block[-self.history:, :self.range_bins]).T
+        n = mag.shape[1]
+
+        first = min(n, self.history - self.head)
+        self.ring[:mag.shape[0], self.head:self.head + first] = mag[:, :first]
+        if n > first:
+            self.ring[:mag.shape[0], :n - first] = mag[:, first:]
+        self.head = (self.head + n) % self.history
+
+        block_max = float(mag.max())
+        if self.levels is None or block_max > self.levels[1]:
+            self.levels = (0.0, block_max if block_max > 0 else 1.0)
+
+        self.dirty = True
+
+    def render(self):
+        if not self.dirty:
+            return
+
+        # oldest column first, newest frame at the top of the plot
+        tail = self.history - self.head
+        self.display[:, :tail] = self.ring[:, self.head:]
+        self.display[:, tail:] = self.ring[:, :self.head]
+
+        self.renders += 1
+        if self.renders % self.level_refresh == 0:
+            ring_max = float(self.ring.max())
+            if ring_max > 0:
+                self.levels = (0.0, ring_max)
+
+        self.image_item.setImage(self.display, autoLevels=False, levels=self.levels or (0.0, 1.0))
+        self.dirty = False
@@ -0,0 +1,40 @@
+import numpy as np
+
+# First byte of a binary packet. Text payloads start with a digit, '-' or '.', so the
+# two formats of the Nano IMU characteristic can be told apart from this byte alone.
+PACKET_MAGIC = 0xB6
+
+# Little endian header followed by count x 6 int16 samples (acc_x, acc_y, acc_z, gyro_x, gyro_y, gyro_z).
+# Physical value = raw * acc_scale for the accelerometer, raw * gyro_scale for the gyroscope.
+PACKET_HEADER = np.dtype([
+    ("magic", "u1"),
+    ("count", "u1"),
+    ("sequence", "<u2"),
+    ("acc_scale", "<f4"),
+    ("gyro_scale", "<f4"),
+])
+
+SAMPLE_VALUES = 6
+
+
+def is_binary_packet(data):
+    return len(data) >= PACKET_HEADER.itemsize and data[0] == PACKET_MAGIC
+
+
+def decode_packet(data):
+    """ Split a binary IMU packet without copying it.
+
+    Returns:
+        header: structured scalar with the PACKET_HEADER fields
+        samples: (count, 6) int16 view on data
+    """
+    header = np.frombuffer(data, dtype=PACKET_HEADER, count=1)[0]
+    samples = np.frombuffer(data, dtype="<i2", count=int(header["count"]) * SAMPLE_VALUES, offset=PACKET_HEADER.itemsize)
+    return header, samples.reshape(-1, SAMPLE_VALUES)
+
+
+def encode_packet(samples, sequence, acc_scale, gyro_scale):
+    """ Inverse of decode_packet, the layout the firmware has to send. samples: (count, 6) raw int16. """
+    samples = np.asarray(samples, dtype="<i2")
+    header = np.array([(PACKET_MAGIC, len(samples), sequence & 0xFFFF, acc_scale, gyro_scale)], dtype=PACKET_HEADER)
+    return header.tobytes() + samples.tobytes()
@@ -0,0 +1,83 @@
+import numpy as np
+
+# sr250_storage settings: frames kept as complex64, or as the int16 I/Q pairs sent by the radar
+STORAGE_MODES = ("complex64", "int16")
+
+
+def to_complex(iq, out=None):
+    """ (..., 2) int16 I/Q pairs -> (...) complex64, exact since float32 holds every int16. """
+    iq = np.asarray(iq)
+    if out is None:
+        out = np.empty(iq.shape[:-1], dtype=np.complex64)
+    out.real = iq[..., 0]
+    out.imag = iq[..., 1]
+    return out
+
+
+def to_iq(frames):
+    """ Inverse of to_complex(), for complex64 frames holding integer I/Q values. """
+    frames = np.asarray(frames)
+    iq = np.empty(frames.shape + (2,), dtype=np.int16)
+    iq[..., 0] = frames.real
+    iq[..., 1] = frames.imag
+    return iq
+
+
+class IQArray:
+    """ Read-only complex64 view of an int16 I/Q array of shape (..., 2).
+
+    Indexing converts only the selected frames, so a memory-mapped recording is read
+    from disk and converted on demand. The int16 data stays available as `raw`.
+
+    Example:
+        frames = load_frames("datasets/SR250Mate/user_walk_20250101-120000_sr250_rx0.npy")
+        window = frames[100:150]  # complex64 (50, range_bins)
+    """
+
+    dtype = np.dtype(np.complex64)
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    @property
+    def shape(self):
+        return self.raw.shape[:-1]
+
+    @property
+    def ndim(self):
+        return self.raw.ndim - 1
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __getitem__(self, index):
+        if not isinstance(index, tuple):
+            index = (index,)
+        if Ellipsis not in index:
+            # the I/Q axis is always taken whole
+            index = index + (Ellipsis,)
+        return to_complex(self.raw[index + (slice(None),)])
+
+    def __array__(self, dtype=None, copy=None):
+        frames = to_complex(self.raw)
+        return frames if dtype is None else frames.astype(dtype)
+
+
+def is_iq(array):
+    return array.dtype == np.int16 and array.ndim >= 2 and array.shape[-1] == 2
+
+
+def load_frames(path, mmap=True):
+    """ Radar frames of a saved antenna file, complex64 whatever the storage mode.
+
+    A .npy file is memory-mapped unless mmap is False. int16 I/Q recordings are returned
+    as an IQArray converting frames when they are indexed, np.asarray() converts them all.
+    """
+    if path.endswith(".h5"):
+        from src.writers import read_array
+
+        frames = read_array(path)
+    else:
+        frames = np.load(path, mmap_mode="r" if mmap else None)
+
+    return IQArray(frames) if is_iq(frames) else frames
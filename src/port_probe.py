@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import serial
+from serial.tools import list_ports
+
+
+def config_dir():
+    """ Per-user folder for what changes from one machine to another, outside the source tree. """
+    base = os.environ.get("APPDATA") or os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "truesense")
+
+
+PORT_CACHE_PATH = os.path.join(config_dir(), "port_cache.json")
+
+
+def port_key(port):
+    """ Identity of a USB serial adapter that survives re-plugging and COM renumbering. """
+    if port.vid is None:
+        return None
+    return f"{port.vid:04X}:{port.pid:04X}:{port.serial_number or ''}"
+
+
+def probe_port(device, info, timeout=1):
+    """ Send INFO to a port and tell whether the answer contains info. """
+    try:
+        with serial.Serial(device, timeout=timeout) as ser:
+            ser.write(b'INFO\r\n')
+            response = ser.read(100).decode('utf-8', errors='ignore')
+        print(f"Response from {device}: {response!r}")
+        return info in response
+    except Exception as e:
+        print(f"Error checking port {device}: {e}")
+        return False
+
+
+class PortCache:
+    """ Last known USB adapter -> device mapping (e.g. "10C4:EA60:0001" -> "SR250"), kept on disk. """
+
+    def __init__(self, path=PORT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r') as f:
+                self.devices = json.load(f)
+        except (OSError, ValueError):
+            self.devices = {}
+
+    def known(self, port, info):
+        key = port_key(port)
+        return key is not None and self.devices.get(key) == info
+
+    def update(self, port, info):
+        key = port_key(port)
+        if key is None:
+            return
+        with self._lock:
+            self.devices[key] = info
+
+    def forget(self, port, info):
+        with self._lock:
+            if self.known(port, info):
+                del self.devices[port_key(port)]
+
+    def save(self):
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, 'w') as f:
+                    json.dump(self.devices, f, indent=4)
+            except OSError as e:
+                print(f"Could not save the port cache: {e}")
+
+
+def find_ports(info, find_all=False, cache=None, max_workers=8, timeout=1):
+    """ Probe the serial ports concurrently for devices answering INFO with info.
+
+    Ports the cache knows as info are probed first, so a device that kept its USB adapter
+    is found in a single probe. Otherwise every port is probed in a worker pool and, unless
+    find_all, the search stops at the first match: queued probes are cancelled and the
+    running ones are waited for, so no port is left open for the acquisition. With find_all
+    every port is probed anyway, the cache only saves time for a single device.
+
+    Returns:
+        list: device names (e.g. "COM3", "/dev/ttyUSB0") sorted by name
+    """
+    ports = list_ports.comports()
+    found = []
+
+    if cache is not None:
+        # the devices seen last time first, alone, so the common case costs one probe
+        cached = [port for port in ports if cache.known(port, info)]
+        found = _probe_all(cached, info, find_all, max_workers, timeout)
+        for port in cached:
+            if port.device not in found:
+                cache.forget(port, info)
+        ports = [port for port in ports if port not in cached]
+
+    if find_all or not found:
+        found += _probe_all(ports, info, find_all, max_workers, timeout)
+
+    if cache is not None:
+        for port in list_ports.comports():
+            if port.device in found:
+                cache.update(port, info)
+        cache.save()
+
+    return sorted(found)
+
+
+def _probe_all(ports, info, find_all, max_workers, timeout):
+    found = []
+    if not ports:
+        return found
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(ports)))
+    futures = {executor.submit(probe_port, port.device, info, timeout): port for port in ports}
+    try:
+        for future in as_completed(futures):
+            if future.result():
+                device = futures[future].device
+                print(f"Found {info} device on port {device}")
+                found.append(device)
+                if not find_all:
+                    break
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return found
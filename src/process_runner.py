@@ -0,0 +1,63 @@
+import multiprocessing
+
+from src.shared_ring import SharedRing
+
+
+class ProcessRunner:
+    """ Hosts a device source in a worker process, its parsed rows come back through a SharedRing.
+
+    target(ring, stop_event, *args) runs in the worker: it opens the device, parses what the
+    device sends and writes rows into ring until stop_event is set. It must be a module level
+    function so it can be started with the spawn method used on Windows. Parsing then runs
+    on another interpreter and never holds the GIL of the GUI or of the other devices.
+
+    Example:
+        runner = ProcessRunner(sr250_source, args=(port, False, clock.start_monotonic), dtype=row_dtype())
+        runner.start()
+        rows = runner.read()  # rows written since the last read
+        runner.stop()
+    """
+
+    def __init__(self, target, args=(), capacity=4096, dtype=None):
+        self.ring = SharedRing(capacity, dtype)
+        self.stop_event = multiprocessing.Event()
+        self.process = multiprocessing.Process(target=_run_source, args=(target, self.ring.spec, self.stop_event, args), daemon=True)
+        self._dropped = 0
+
+    @property
+    def dropped(self):
+        """ Rows the worker could not write because the ring was full, still valid after stop(). """
+        return self.ring.dropped if self.ring is not None else self._dropped
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def start(self):
+        self.process.start()
+
+    def read(self, max_rows=None):
+        return self.ring.read(max_rows)
+
+    def stop(self, timeout=5.0):
+        """ Ask the worker to return, wait for it, then free the ring. Rows not read are lost. """
+        self.stop_event.set()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            print(f"Worker process {self.process.pid} did not stop, terminating it")
+            self.process.terminate()
+            self.process.join()
+
+        self._dropped = self.ring.dropped
+        self.ring.close()
+        self.ring.unlink()
+        self.ring = None
+
+
+def _run_source(target, ring_spec, stop_event, args):
+    ring = SharedRing.attach(*ring_spec)
+    try:
+        target(ring, stop_event, *args)
+    except Exception as e:
+        print(f"Worker process error: {e}")
+    finally:
+        ring.close()
@@ -0,0 +1,116 @@
+import json
+
+# target positions of the GUI grid, numbered from 1 like its radio buttons: (distance in cm, angle in degrees)
+GRID_POSITIONS = [
+    (150, 0), (150, 22.5), (150, 45), (150, 67.5), (150, 90),  # Row 1
+    (250, 0), (250, 22.5), (250, 45), (250, 67.5), (250, 90),  # Row 2
+    (350, 0), (350, 22.5), (350, 45), (350, 67.5), (350, 90),  # Row 3
+    (450, 0), (450, 22.5), (450, 45), (450, 67.5), (450, 90),  # Row 4
+]
+
+
+def position_label(number):
+    """ Grid position number -> the label used in file names, e.g. 2 -> "(150,22.5)". """
+    if not 1 <= number <= len(GRID_POSITIONS):
+        raise ValueError(f"Unknown grid position {number}, use 1 to {len(GRID_POSITIONS)}")
+    return str(GRID_POSITIONS[number - 1]).replace(" ", "")
+
+
+class ProtocolStep:
+    """ One acquisition of a protocol. """
+
+    def __init__(self, number, activity, position, repetition):
+        self.number = number
+        self.activity = activity
+        # grid position number, None when the protocol has no positions
+        self.position = position
+        self.repetition = repetition
+
+    @property
+    def target_position(self):
+        return position_label(self.position) if self.position is not None else None
+
+    def __repr__(self):
+        where = f" at position {self.position}" if self.position is not None else ""
+        return f"{self.number}. {self.activity}{where}, repetition {self.repetition}"
+
+
+class Protocol:
+    """ A batch of acquisitions: activities x positions x repetitions, with a rest between two.
+
+    Read from a JSON file, every key but "activities" being optional:
+
+        {
+            "user": "user01",
+            "room": "lab",
+            "activities": ["Still position", "Right arm up"],
+            "positions": [3, 8, 13],
+            "repetitions": 2,
+            "samples_number": 1,
+            "window_duration": 30,
+            "rest_s": 10,
+            "countdown_s": 3
+        }
+
+    Activities must be listed in logger_conf.json, positions are the numbers of the GUI grid.
+    The steps go through the activities at one position before moving the subject to the
+    next position, each activity being repeated back to back.
+    """
+
+    def __init__(self, activities, positions=None, repetitions=1, samples_number=1, window_duration=60,
+                 rest_s=0.0, countdown_s=3, user=None, room=None):
+        if not activities:
+            raise ValueError("A protocol needs at least one activity")
+        # whole numbers, like the form fields and the QTimer intervals they end up in
+        for name, value in (("repetitions", repetitions), ("samples_number", samples_number), ("window_duration", window_duration), ("countdown_s", countdown_s)):
+            if isinstance(value, bool) or not isinstance(value, int) and not (isinstance(value, float) and value.is_integer()):
+                raise ValueError(f"{name} must be a whole number, not {value!r}")
+        if repetitions < 1 or samples_number < 1 or window_duration < 1:
+            raise ValueError("repetitions, samples_number and window_duration must be positive")
+        if countdown_s < 0 or rest_s < 0:
+            raise ValueError("countdown_s and rest_s cannot be negative")
+
+        self.activities = list(activities)
+        self.positions = list(positions) if positions else []
+        for number in self.positions:
+            position_label(number)
+        self.repetitions = int(repetitions)
+        self.samples_number = int(samples_number)
+        self.window_duration = int(window_duration)
+        self.rest_s = float(rest_s)
+        self.countdown_s = int(countdown_s)
+        self.user = user
+        self.room = room
+
+    @classmethod
+    def load(cls, path, config):
+        with open(path, "r") as f:
+            settings = json.load(f)
+
+        known = config.get("activities", [])
+        unknown = [a for a in settings.get("activities", []) if a not in known]
+        if unknown:
+            raise ValueError(f"Activities not in logger_conf.json: {', '.join(unknown)}")
+
+        try:
+            return cls(**settings)
+        except TypeError as e:
+            raise ValueError(f"Invalid protocol {path}: {e}")
+
+    def steps(self):
+        steps = []
+        for position in self.positions or [None]:
+            for activity in self.activities:
+                for repetition in range(1, self.repetitions + 1):
+                    steps.append(ProtocolStep(len(steps) + 1, activity, position, repetition))
+        return steps
+
+    @property
+    def step_duration(self):
+        return self.samples_number * self.window_duration
+
+    @property
+    def duration(self):
+        """ Seconds from the first countdown to the end of the last recording. """
+        n = len(self.steps())
+        return n * (self.countdown_s + self.step_duration) + (n - 1) * self.rest_s
@@ -0,0 +1,42 @@
+import numpy as np
+
+
+class RangeFFT:
+    """ Range FFT of FMCW chirps, batched over any leading dimensions (antennas, chirps).
+
+    Same processing as the previous Logger.fft_spectrum: remove the DC bias of every chirp,
+    apply a Blackman-Harris window, zero pad to twice the chirp length and keep the first
+    num_samples bins scaled by 2 / num_samples. The window, the padded input buffer and
+    the spectrum buffer are allocated once and reused for every frame.
+    """
+
+    def __init__(self, num_samples):
+        # scipy is only needed by the FMCW radar, not at logger startup
+        from scipy import signal
+
+        self.num_samples = num_samples
+        self.window = signal.windows.blackmanharris(num_samples).astype(np.float32)
+        self._padded = None
+        self._spectrum = None
+
+    def _allocate(self, leading_shape):
+        # the second half of the padded buffer is never written, so it stays zero
+        self._padded = np.zeros(leading_shape + (2 * self.num_samples,), dtype=np.float32)
+        self._spectrum = np.empty(leading_shape + (self.num_samples + 1,), dtype=np.complex64)
+
+    def __call__(self, chirps):
+        """ chirps: (..., num_samples) real samples. Returns (..., num_samples) complex64.
+        The result is a view on an internal buffer, overwritten by the next call. """
+        leading_shape = chirps.shape[:-1]
+        if self._padded is None or self._padded.shape[:-1] != leading_shape:
+            self._allocate(leading_shape)
+
+        samples = self._padded[..., :self.num_samples]
+        np.subtract(chirps, chirps.mean(axis=-1, keepdims=True), out=samples)
+        samples *= self.window
+
+        np.fft.rfft(self._padded, axis=-1, out=self._spectrum)
+
+        range_fft = self._spectrum[..., :self.num_samples]
+        range_fft *= 2 / self.num_samples
+        return range_fft
@@ -0,0 +1,80 @@
+import threading
+
+import numpy as np
+
+
+class RingBuffer:
+    """ Fixed-capacity FIFO of fixed-width rows stored in a preallocated 2D NumPy array.
+
+    Meant for one producer thread (write) and one consumer thread (read). When the
+    consumer falls behind by more than capacity rows the oldest rows are overwritten
+    and counted in `overwritten`, so the producer never blocks and memory never grows.
+
+    Example:
+        ring = RingBuffer(1024, width=3)
+        ring.write(np.array([[0.0, 1.2, 3.4]]))
+        rows = ring.read()  # (n, 3) copy of the rows written since the last read
+    """
+
+    def __init__(self, capacity, width, dtype=np.float64):
+        self.capacity = capacity
+        self.width = width
+        self._data = np.empty((capacity, width), dtype=dtype)
+        self._lock = threading.Lock()
+        self._head = 0  # total rows ever written
+        self._tail = 0  # total rows ever read or overwritten
+        self.overwritten = 0
+        # set by close(): the producer will not write any more rows
+        self.closed = False
+        self.error = None
+
+    def __len__(self):
+        return self._head - self._tail
+
+    def write(self, rows):
+        """ Append a (n, width) block of rows. """
+        # a block longer than the buffer loses its first rows before they are even stored
+        trimmed = max(0, len(rows) - self.capacity)
+        rows = rows[trimmed:]
+        n = len(rows)
+        if n == 0:
+            return
+
+        with self._lock:
+            self.overwritten += trimmed
+            start = self._head % self.capacity
+            first = min(n, self.capacity - start)
+            self._data[start:start + first] = rows[:first]
+            self._data[:n - first] = rows[first:]
+            self._head += n
+
+            excess = self._head - self._tail - self.capacity
+            if excess > 0:
+                self._tail += excess
+                self.overwritten += excess
+
+    def read(self, max_rows=None, consume=True):
+        """ Copy of the oldest rows, up to max_rows. With consume=False they are left in
+        the buffer, which lets a consumer align several rings before taking rows out. """
+        with self._lock:
+            n = self._head - self._tail
+            if max_rows is not None:
+                n = min(n, max_rows)
+
+            start = self._tail % self.capacity
+            first = min(n, self.capacity - start)
+            rows = np.concatenate((self._data[start:start + first], self._data[:n - first]))
+
+            if consume:
+                self._tail += n
+
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._tail = self._head
+
+    def close(self, error=None):
+        """ Mark the end of the rows, with the error that stopped the producer if any. """
+        self.error = error
+        self.closed = True
@@ -0,0 +1,73 @@
+import re
+import threading
+import time
+
+FRAME = 0
+RANGING = 1
+
+
+class SerialFrameReader(threading.Thread):
+    """ Reads the SR250 serial stream in bulk and pushes complete frames into a FrameQueue.
+
+    The radar sends every CIR between a b"BEGIN\\n" and a b"END\\n" line. Outside of a frame
+    the ranging firmware also prints "TWR[0].distance: <value>" lines. Items put in the
+    queue are (FRAME, payload_bytes, t) or (RANGING, raw_distance, t) tuples, in arrival
+    order, where t is the arrival time on clock (a SessionClock, or time.monotonic when
+    None). The thread does no decoding, so it keeps up with the 1.5 Mbaud stream
+    regardless of what the consumer is doing.
+    """
+
+    def __init__(self, ser, queue, read_ranging=False, clock=None, chunk_size=8192):
+        super().__init__(daemon=True)
+        self.ser = ser
+        self.queue = queue
+        self.read_ranging = read_ranging
+        self.now = clock.now if clock is not None else time.monotonic
+        self.chunk_size = chunk_size
+        self._stop_reading = threading.Event()
+        self._pattern = re.compile(rb":\s*(\d+)")
+
+    def stop(self):
+        self._stop_reading.set()
+
+    def run(self):
+        pending = bytearray()
+        frame = bytearray()
+        in_frame = False
+
+        try:
+            while not self._stop_reading.is_set():
+                data = self.ser.read(max(1, min(self.ser.in_waiting, self.chunk_size)))
+                if not data:
+                    continue
+                pending += data
+
+                start = 0
+                while True:
+                    end = pending.find(b"\n", start)
+                    if end < 0:
+                        break
+                    line = bytes(pending[start:end + 1])
+                    start = end + 1
+
+                    if not in_frame:
+                        if line == b"BEGIN\n":
+                            in_frame = True
+                        elif self.read_ranging and b"TWR[0].distance" in line:
+                            match = self._pattern.search(line)
+                            if match:
+                                self.queue.put((RANGING, int(match.group(1)), self.now()))
+                            else:
+                                print("Error parsing presence data: ", line)
+                    elif line == b"END\n":
+                        # the last newline belongs to the END marker, not to the frame
+                        self.queue.put((FRAME, bytes(frame[:-1]), self.now()))
+                        frame.clear()
+                        in_frame = False
+                    else:
+                        frame += line
+
+                del pending[:start]
+
+        except Exception as e:
+            print(f"Serial reader error: {e}")
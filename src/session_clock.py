@@ -0,0 +1,28 @@
+import time
+
+
+class SessionClock:
+    """ Monotonic clock shared by every acquisition worker of a session.
+
+    now() returns seconds since start() on time.monotonic(), so timestamps from different
+    threads and devices are directly comparable and immune to wall clock adjustments.
+    start_wall keeps the matching time.time() to place the session in calendar time.
+    """
+
+    def __init__(self):
+        self.start()
+
+    def start(self):
+        self.start_monotonic = time.monotonic()
+        self.start_wall = time.time()
+
+    @classmethod
+    def resume(cls, start_monotonic, start_wall):
+        """ The same clock in another process: time.monotonic() is system wide. """
+        clock = cls.__new__(cls)
+        clock.start_monotonic = start_monotonic
+        clock.start_wall = start_wall
+        return clock
+
+    def now(self):
+        return time.monotonic() - self.start_monotonic
@@ -0,0 +1,103 @@
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# written rows, read rows, dropped rows, padded to a cache line
+_HEADER_BYTES = 64
+
+
+class SharedRing:
+    """ Fixed-capacity FIFO of NumPy rows in shared memory, for one producer process and one
+    consumer process.
+
+    Rows are any NumPy dtype, structured ones included (e.g. a timestamp and a radar frame),
+    so a worker process hands parsed samples to the acquisition without pickling. The
+    producer never overwrites unread rows: when the ring is full new rows are dropped and
+    counted in `dropped`, like FrameQueue does between threads.
+
+    Example:
+        ring = SharedRing(1024, [("time", np.float64), ("value", np.float32, (3,))])
+        # in the worker process
+        ring = SharedRing.attach(*ring.spec)
+        ring.write(rows)
+        # in the acquisition
+        rows = ring.read()
+    """
+
+    def __init__(self, capacity, dtype, name=None, create=True):
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=_HEADER_BYTES + capacity * self.dtype.itemsize)
+        else:
+            self.shm = _attach(name)
+
+        self._counters = np.ndarray(3, dtype=np.int64, buffer=self.shm.buf)
+        self._data = np.ndarray(capacity, dtype=self.dtype, buffer=self.shm.buf, offset=_HEADER_BYTES)
+        if create:
+            self._counters[:] = 0
+
+    @classmethod
+    def attach(cls, name, capacity, dtype):
+        return cls(capacity, dtype, name=name, create=False)
+
+    @property
+    def spec(self):
+        """ Arguments of attach(), picklable, to open the same ring in another process. """
+        return self.shm.name, self.capacity, self.dtype
+
+    @property
+    def dropped(self):
+        return int(self._counters[2])
+
+    def __len__(self):
+        return int(self._counters[0] - self._counters[1])
+
+    def write(self, rows):
+        """ Append rows, returns how many fit. Producer side only. """
+        written, read = int(self._counters[0]), int(self._counters[1])
+        n = min(len(rows), self.capacity - (written - read))
+
+        start = written % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = rows[:first]
+        self._data[:n - first] = rows[first:n]
+
+        # the rows are in place before the consumer can see them
+        self._counters[0] = written + n
+        self._counters[2] += len(rows) - n
+        return n
+
+    def read(self, max_rows=None):
+        """ Copy of the oldest unread rows, up to max_rows. Consumer side only. """
+        written, read = int(self._counters[0]), int(self._counters[1])
+        n = written - read
+        if max_rows is not None:
+            n = min(n, max_rows)
+
+        start = read % self.capacity
+        first = min(n, self.capacity - start)
+        rows = np.concatenate((self._data[start:start + first], self._data[:n - first]))
+
+        self._counters[1] = read + n
+        return rows
+
+    def close(self):
+        # the arrays are views on the buffer, they must go before the mapping is closed
+        del self._counters, self._data
+        self.shm.close()
+
+    def unlink(self):
+        """ Free the shared memory, by the process that created the ring, after close(). """
+        self.shm.unlink()
+
+
+def _attach(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    # a multiprocessing child shares the resource tracker of its parent, registering the
+    # segment again there is harmless and the creator still unlinks it once
+    return shared_memory.SharedMemory(name=name)
@@ -0,0 +1,129 @@
+import time
+
+import numpy as np
+import serial
+
+from src.frame_buffer import FrameQueue
+from src.serial_reader import SerialFrameReader, FRAME
+from src.session_clock import SessionClock
+
+# row kind of a frame with the wrong size, its length is in distance
+DISCARDED = -1
+
+# the first range bins hold near-field and hardware offsets, then one bin is 15 cm
+BIN_OFFSET = 6
+BIN_SIZE_CM = 15
+
+
+def range_of_interest(setting, range_bins=120):
+    """ (start_bin, stop_bin) kept of every CIR for the sr250_range_of_interest setting.
+
+    setting is None (every bin), {"start_cm": .., "end_cm": ..} converted like
+    tools/log_viewer.ipynb does, or {"start_bin": .., "end_bin": ..}.
+    """
+    if not setting:
+        return 0, range_bins
+
+    if "start_cm" in setting or "end_cm" in setting:
+        start = int(setting.get("start_cm", 0) / BIN_SIZE_CM) + BIN_OFFSET
+        stop = int(setting["end_cm"] / BIN_SIZE_CM) + BIN_OFFSET if "end_cm" in setting else range_bins
+    else:
+        start = int(setting.get("start_bin", 0))
+        stop = int(setting.get("end_bin", range_bins))
+
+    start, stop = min(start, range_bins), min(stop, range_bins)
+    if start >= stop:
+        raise ValueError(f"Empty SR250 range of interest {setting}: bins {start} to {stop}")
+    return start, stop
+
+
+def frame_shape(num_ant, range_bins, storage="complex64"):
+    """ Shape and dtype of one stored frame, int16 storage keeps the I/Q pairs. """
+    if storage == "int16":
+        return (num_ant, range_bins, 2), np.int16
+    return (num_ant, range_bins), np.complex64
+
+
+def row_dtype(num_ant, range_bins, storage="complex64"):
+    """ One item of the SR250 stream: a frame, a ranging value or a discarded frame (frame left empty). """
+    shape, dtype = frame_shape(num_ant, range_bins, storage)
+    return np.dtype([
+        ("kind", np.int8),
+        ("time", np.float64),
+        ("distance", np.int64),
+        ("frame", dtype, shape),
+    ])
+
+
+def decode_frames(payloads, out, num_ant, taps, range_bins, bins=None):
+    """ Decode SR250 CIR payloads into out, a (len(payloads), num_ant, stop - start) complex
+    array or a (len(payloads), num_ant, stop - start, 2) int16 one that keeps the raw I/Q
+    pairs, bins being the (start, stop) range of interest, every bin when None. """
+    # each antenna is 2 * taps int16: a 16 value header followed by interleaved I/Q pairs
+    raw = np.frombuffer(b"".join(payloads), dtype=np.int16).reshape(len(payloads), num_ant, taps * 2)
+    iq = raw[:, :, 16:].reshape(len(payloads), num_ant, range_bins, 2)
+    if bins is not None:
+        # only the kept bins are converted to complex64
+        iq = iq[:, :, bins[0]:bins[1]]
+
+    if out.dtype == np.int16:
+        out[...] = iq
+        return
+
+    out.real = iq[..., 0]
+    out.imag = iq[..., 1]
+
+
+def sr250_source(ring, stop_event, port, read_ranging, start_monotonic, start_wall, num_ant=3, taps=128, range_bins=120, bins=None, storage="complex64"):
+    """ ProcessRunner target: reads and decodes an SR250 in a worker process.
+
+    Every frame and ranging value goes into ring as a row_dtype() row, stamped on the
+    session clock of the acquisition (start_monotonic, start_wall). Frames keep the bins
+    (start, stop) only, all of them when bins is None, as complex64 or int16 I/Q pairs
+    depending on storage.
+    """
+    clock = SessionClock.resume(start_monotonic, start_wall)
+    queue = FrameQueue(maxlen=4096)
+    bins = bins or (0, range_bins)
+    dtype = row_dtype(num_ant, bins[1] - bins[0], storage)
+    shape, frame_dtype = frame_shape(num_ant, bins[1] - bins[0], storage)
+    bytes_per_cir = taps * 4 * num_ant
+
+    with serial.Serial(port, timeout=1) as ser:
+        ser.write(b"START")
+
+        reader = SerialFrameReader(ser, queue, read_ranging, clock=clock)
+        reader.start()
+
+        while not stop_event.is_set():
+            items = queue.drain()
+            if not items:
+                time.sleep(0.002)
+                continue
+
+            for i, (kind, value, t) in enumerate(items):
+                if kind == FRAME and len(value) != bytes_per_cir:
+                    print("Frame of shape ", (len(value),), "discarded")
+                    # still passed on, the acquisition counts the malformed frames
+                    items[i] = (DISCARDED, len(value), t)
+
+            rows = np.zeros(len(items), dtype=dtype)
+            rows["kind"] = [kind for kind, _, _ in items]
+            rows["time"] = [t for _, _, t in items]
+
+            is_frame = rows["kind"] == FRAME
+            if is_frame.any():
+                frames = np.empty((int(is_frame.sum()),) + shape, dtype=frame_dtype)
+                decode_frames([value for kind, value, _ in items if kind == FRAME], frames, num_ant, taps, range_bins, bins)
+                rows["frame"][is_frame] = frames
+            rows["distance"][~is_frame] = [value for kind, value, _ in items if kind != FRAME]
+
+            ring.write(rows)
+
+        reader.stop()
+        reader.join()
+
+        if queue.dropped:
+            print(f"SR250 reader queue full, {queue.dropped} frames dropped")
+
+        ser.write(b"STOP")
@@ -0,0 +1,61 @@
+import subprocess
+import sys
+import time
+
+# imported first by logger.py, so this is as close as possible to the interpreter start
+STARTED = time.perf_counter()
+
+FLAG = "--profile-startup"
+
+
+def enabled():
+    return FLAG in sys.argv
+
+
+def requested():
+    """ The profile mode was asked for and this process is not yet the profiled one. """
+    return enabled() and "importtime" not in sys._xoptions
+
+
+def mark(label):
+    """ Print the time elapsed since the logger started importing, in profile mode only. """
+    if enabled():
+        print(f"startup: {label:<14} {time.perf_counter() - STARTED:7.3f} s", flush=True)
+
+
+def run(top=20):
+    """ Run the logger again under `python -X importtime`, pass its output through and
+    print the slowest imports. Returns the exit code of the profiled run. """
+    result = subprocess.run([sys.executable, "-X", "importtime", *sys.argv], capture_output=True, text=True)
+    sys.stdout.write(result.stdout)
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:"):
+            entry = parse_importtime(line)
+            if entry is not None:
+                entries.append(entry)
+        else:
+            print(line, file=sys.stderr)
+
+    # modules imported directly by the logger or by nothing else, with everything they pulled in
+    first_level = sorted((e for e in entries if e[3] == 0), key=lambda e: e[2], reverse=True)
+    total = sum(e[2] for e in first_level)
+
+    print(f"\nimport time: {total / 1e6:.3f} s over {len(entries)} modules, slowest first")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for name, self_us, cumulative_us, _ in first_level[:top]:
+        print(f"{cumulative_us / 1e3:9.1f} ms {self_us / 1e3:7.1f} ms  {name}")
+
+    return result.returncode
+
+
+def parse_importtime(line):
+    """ "import time:  self [us] | cumulative | module" -> (module, self_us, cumulative_us, depth) """
+    fields = line[len("import time:"):].split("|")
+    if len(fields) != 3 or not fields[0].strip().isdigit():
+        return None  # the header line
+
+    name = fields[2]
+    depth = (len(name) - len(name.lstrip()) - 1) // 2
+    return name.strip(), int(fields[0]), int(fields[1]), depth
@@ -0,0 +1,292 @@
+import os
+import queue
+import threading
+import time
+from itertools import chain
+
+import numpy as np
+
+SAVE_FORMATS = {"csv": ".csv", "npy": ".npy", "h5": ".h5"}
+
+
+def write_columns(path, columns, fmt="csv", rows_per_chunk=100000):
+    """ Write a table given as columns in a single vectorized pass.
+
+    Args:
+        path (str): output path without extension, the extension of fmt is appended
+        columns (dict): column name -> 1D array, all of the same length
+        fmt (str): "csv" (text, one header line), "npy" (structured array whose field names
+            are the column names) or "h5" (one dataset per column, order kept in the
+            "columns" attribute)
+
+    Returns:
+        str: the path of the written file
+    """
+    if fmt not in SAVE_FORMATS:
+        raise ValueError(f"Unknown save format {fmt}, use one of {list(SAVE_FORMATS)}")
+
+    path += SAVE_FORMATS[fmt]
+    columns = {name: np.asarray(values) for name, values in columns.items()}
+
+    if fmt == "csv":
+        _write_csv(path, columns, rows_per_chunk)
+    elif fmt == "npy":
+        np.save(path, _to_structured(columns))
+    else:
+        _write_h5(path, columns)
+
+    return path
+
+
+def _write_csv(path, columns, rows_per_chunk):
+    names = list(columns)
+    num_rows = len(columns[names[0]]) if names else 0
+    row = ",".join(["%s"] * len(names)) + "\n"
+
+    with open(path, "w", newline="") as f:
+        f.write(",".join(names) + "\n")
+
+        for start in range(0, num_rows, rows_per_chunk):
+            # tolist() converts a whole column to Python scalars in C, then a single
+            # % formats every row of the chunk at once
+            chunk = [columns[name][start:start + rows_per_chunk].tolist() for name in names]
+            f.write((row * len(chunk[0])) % tuple(chain.from_iterable(zip(*chunk))))
+
+
+def _to_structured(columns):
+    num_rows = len(next(iter(columns.values()))) if columns else 0
+    table = np.empty(num_rows, dtype=[(name, values.dtype) for name, values in columns.items()])
+    for name, values in columns.items():
+        table[name] = values
+    return table
+
+
+def _write_h5(path, columns):
+    import h5py
+
+    with h5py.File(path, "w") as f:
+        for name, values in columns.items():
+            f.create_dataset(name, data=values)
+        f.attrs["columns"] = list(columns)
+
+
+def read_columns(path):
+    """ Load a file written by write_columns() as a dict column name -> array. """
+    if path.endswith(".npy"):
+        table = np.load(path)
+        return {name: table[name] for name in table.dtype.names}
+
+    if path.endswith(".h5"):
+        import h5py
+
+        with h5py.File(path, "r") as f:
+            return {name: f[name][()] for name in f.attrs["columns"]}
+
+    table = np.genfromtxt(path, delimiter=",", names=True)
+    return {name: table[name] for name in table.dtype.names}
+
+
+def array_path(path, compression=None):
+    """ Path write_array() writes to: .npy, or .h5 when the array is compressed. """
+    return path + (".h5" if compression else ".npy")
+
+
+def write_array(path, array, compression=None, rows_per_chunk=1024):
+    """ Save one array, as .npy or as a chunked and compressed HDF5 dataset named "data".
+
+    Args:
+        path (str): output path without extension
+        compression (str): None for .npy, "gzip" or "lzf" for .h5
+
+    Returns:
+        str: the path of the written file
+    """
+    if compression:
+        try:
+            import h5py
+        except ImportError:
+            # a recording is never lost to a missing optional package
+            print("h5py is not installed, saving the array uncompressed")
+            compression = None
+
+    if not compression:
+        path = array_path(path)
+        np.save(path, array)
+        return path
+
+    path = array_path(path, compression)
+    chunks = (min(len(array), rows_per_chunk),) + array.shape[1:] if len(array) else None
+    with h5py.File(path, "w") as f:
+        # shuffle groups the bytes of the samples, radar frames then compress much better
+        f.create_dataset("data", data=array, chunks=chunks, compression=compression, shuffle=True)
+    return path
+
+
+def read_array(path):
+    """ Load a file written by write_array(). """
+    if path.endswith(".h5"):
+        import h5py
+
+        with h5py.File(path, "r") as f:
+            return f["data"][()]
+    return np.load(path)
+
+
+class WriterService:
+    """ Saves the recordings on one background thread, so saving never blocks an acquisition.
+
+    submit(job, on_done, on_error) queues job(), a function writing one or more files and
+    returning their paths. The thread takes every job waiting in the queue at once, runs
+    them, fsyncs the written files and only then calls each on_done(paths): a recording is
+    reported as saved once it is on disk. A job that raises calls on_error(exception)
+    instead, so the loss of a recording is reported too. The queue is bounded, submit()
+    waits when max_pending jobs are already waiting.
+
+    Example:
+        writer = WriterService()
+        writer.submit(lambda: write_columns(path, columns, "csv"), on_done=print)
+        writer.stop()  # waits for the queued jobs
+    """
+
+    def __init__(self, max_pending=16, fsync=True):
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.fsync = fsync
+        self.files_written = 0
+        self.bytes_written = 0
+        self.write_time = 0.0
+        self.thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+
+    def submit(self, job, on_done=None, on_error=None):
+        self.start()
+        try:
+            self.queue.put_nowait((job, on_done, on_error))
+        except queue.Full:
+            print(f"Writer queue full ({self.queue.maxsize} jobs), waiting")
+            self.queue.put((job, on_done, on_error))
+
+    def submit_columns(self, path, columns, fmt, on_done=None, on_error=None):
+        """ write_columns() in the background, then on_done(file_path).
+
+        The columns must not be modified until the write is over, pass copies of buffers
+        that the acquisition keeps filling.
+        """
+        self.submit(lambda: write_columns(path, columns, fmt), on_done, on_error)
+
+    def wait(self):
+        """ Block until every submitted job is written. """
+        self.queue.join()
+
+    def stop(self):
+        """ Write what is still queued, then end the thread. """
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.thread = None
+
+    @property
+    def pending(self):
+        return self.queue.qsize()
+
+    @property
+    def idle(self):
+        """ Nothing queued and nothing being written. """
+        return self.queue.unfinished_tasks == 0
+
+    @property
+    def throughput(self):
+        """ Bytes per second spent writing, over the whole session. """
+        return self.bytes_written / self.write_time if self.write_time > 0 else 0.0
+
+    def summary(self):
+        return f"{'writer':<11} {self.files_written} files  {self.bytes_written / 1e6:.1f} MB  {self.throughput / 1e6:.1f} MB/s  queue {self.pending}"
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            try:
+                self._write_batch([item for item in batch if item is not None])
+            except Exception as e:
+                # the thread must outlive any error, or wait() and idle would never see the batch end
+                print(f"Error in writer batch: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+            if stop:
+                return
+
+    def _write_batch(self, jobs):
+        start = time.perf_counter()
+        done = []
+        for job, on_done, on_error in jobs:
+            try:
+                result = job()
+            except Exception as e:
+                print(f"Error saving: {e}")
+                if on_error is not None:
+                    try:
+                        on_error(e)
+                    except Exception as e:
+                        print(f"Error reporting a failed save: {e}")
+                continue
+            done.append((result, on_done))
+
+        try:
+            paths = [path for result, _ in done for path in ([result] if isinstance(result, str) else result)]
+            if self.fsync:
+                _fsync(paths)
+
+            elapsed = time.perf_counter() - start
+            size = sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+            self.files_written += len(paths)
+            self.bytes_written += size
+            self.write_time += elapsed
+            if paths:
+                print(f"Writer: {len(paths)} files, {size / 1e6:.1f} MB in {elapsed:.2f} s ({size / 1e6 / max(elapsed, 1e-9):.1f} MB/s)")
+        finally:
+            # the files are written even when the accounting fails, their callbacks still run
+            for result, on_done in done:
+                if on_done is not None:
+                    try:
+                        on_done(result)
+                    except Exception as e:
+                        print(f"Error after saving {result}: {e}")
+
+
+def _fsync(paths):
+    for path in paths:
+        try:
+            # Windows flushes a file only through a handle with write access
+            fd = os.open(path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            print(f"Could not fsync {path}: {e}")
+
+    if os.name == "posix":
+        # the new directory entries too, once per directory
+        for folder in {os.path.dirname(os.path.abspath(path)) for path in paths}:
+            try:
+                fd = os.open(folder, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                print(f"Could not fsync {folder}: {e}")